@@ -44,6 +44,8 @@ chmod a+x %{buildroot}%{python_sitelib}/%{framework_name}/{module_framework,mtf_
 %{_bindir}/moduleframework-cmd
 %{_bindir}/modulelint
 %{_bindir}/mtf-generator
+%{_bindir}/mtf-prewarm
+%{_bindir}/mtf-container-pool
 %{python2_sitelib}/moduleframework/
 %{python2_sitelib}/modularity_testing_framework-*.egg-info/
 %{_datadir}/moduleframework/
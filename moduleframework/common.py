@@ -26,24 +26,51 @@ It provides some general functions
 """
 
 import sys
-import netifaces
 import socket
 import os
 import linecache
+import pipes
+import atexit
+import logging
+import tempfile
+import threading
+import Queue
 
 
 class ModuleFrameworkException(Exception):
+    """
+    Base exception of framework. Context of exception what was handled when this one was created
+    is captured cheaply and rendered just when exception is displayed (str)
+    """
+
     def __init__(self, *args, **kwargs):
         super(ModuleFrameworkException, self).__init__(
             'EXCEPTION MTF: ', *args, **kwargs)
+        self.context = None
+        self.__diagnostics = None
         exc_type, exc_obj, tb = sys.exc_info()
         if tb is not None:
-            f = tb.tb_frame
-            lineno = tb.tb_lineno
-            filename = f.f_code.co_filename
+            self.context = (tb.tb_frame.f_code.co_filename, tb.tb_lineno, exc_obj)
+
+    def diagnostics(self):
+        """
+        Return description of original exception (file, line and error), rendered just once
+
+        :return: str or None
+        """
+        if self.context is not None and self.__diagnostics is None:
+            filename, lineno, exc_obj = self.context
             linecache.checkcache(filename)
-            line = linecache.getline(filename, lineno, f.f_globals)
-            print "-----------\n| EXCEPTION IN: {} \n| LINE: {}, {} \n| ERROR: {}\n-----------".format(filename, lineno, line.strip(), exc_obj)
+            line = linecache.getline(filename, lineno)
+            self.__diagnostics = "-----------\n| EXCEPTION IN: {} \n| LINE: {}, {} \n| ERROR: {}\n-----------".format(
+                filename, lineno, line.strip(), exc_obj)
+        return self.__diagnostics
+
+    def __str__(self):
+        out = super(ModuleFrameworkException, self).__str__()
+        if self.context is not None:
+            out = "%s\n%s" % (out, self.diagnostics())
+        return out
 
 
 class NspawnExc(ModuleFrameworkException):
@@ -76,34 +103,205 @@ class KojiExc(ModuleFrameworkException):
         super(KojiExc, self).__init__('TYPE Koji', *args, **kwargs)
 
 
-defroutedev = netifaces.gateways().get('default').values(
-)[0][1] if netifaces.gateways().get('default') else "lo"
-hostipaddr = netifaces.ifaddresses(defroutedev)[2][0]['addr']
-hostname = socket.gethostname()
+class ParallelRunExc(ModuleFrameworkException):
+    """
+    Failure of commands run by runParallel, it lists every failed command.
+    results contains result of every command (None for failed ones), failures maps index of failed
+    command to its exception
+    """
+
+    def __init__(self, commands, results, failures):
+        super(ParallelRunExc, self).__init__(
+            'TYPE parallel run', "%d of %d commands failed:" % (len(failures), len(commands)),
+            *["%s: %s" % (commands[index], failures[index]) for index in sorted(failures)])
+        self.results = results
+        self.failures = failures
+
+
 dusername = "test"
 dpassword = "test"
 ddatabase = "basic"
-hostpackager = "yum -y"
 guestpackager = "microdnf"
-if os.path.exists('/usr/bin/dnf'):
-    hostpackager = "dnf -y"
 ARCH = "x86_64"
 
+
+class LazyValue(object):
+    """
+    Value of trans_dict what is computed on first use and memoized.
+    It allows to not probe host (network, filesystem) when module is imported
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.resolved = False
+        self.value = None
+
+    def get(self):
+        """
+        Return computed value, function is called just once
+
+        :return: object
+        """
+        if not self.resolved:
+            self.value = self.func()
+            self.resolved = True
+        return self.value
+
+    def __str__(self):
+        return str(self.get())
+
+    def __format__(self, format_spec):
+        return format(self.get(), format_spec)
+
+    def __repr__(self):
+        return repr(self.get())
+
+
+class TransDict(dict):
+    """
+    Dictionary what transparently resolves LazyValue items.
+    Values are resolved also when dict is used for formatting like
+    "{HOSTIPADDR}".format(**trans_dict)
+    """
+
+    def __getitem__(self, key):
+        value = super(TransDict, self).__getitem__(key)
+        if isinstance(value, LazyValue):
+            return value.get()
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def copy(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+def get_defroute():
+    """
+    Return name of network device with default route, "lo" in case there is no default route
+
+    :return: str
+    """
+    import netifaces
+    default = netifaces.gateways().get('default')
+    return default.values()[0][1] if default else "lo"
+
+
+def get_hostipaddr():
+    """
+    Return IP address of device with default route
+
+    :return: str
+    """
+    import netifaces
+    return netifaces.ifaddresses(_defroute.get())[2][0]['addr']
+
+
+def get_hostpackager():
+    """
+    Return package manager command used on host
+
+    :return: str
+    """
+    if os.path.exists('/usr/bin/dnf'):
+        return "dnf -y"
+    return "yum -y"
+
+
+def get_hostarch():
+    """
+    Return architecture of host (same as uname -m), it is read in-process
+
+    :return: str
+    """
+    return os.uname()[4]
+
+
+_defroute = LazyValue(get_defroute)
+_hostipaddr = LazyValue(get_hostipaddr)
+_hostarch = LazyValue(get_hostarch)
+
 # translation table for config.yaml files syntax is {VARIABLE} in config file
-trans_dict = {"HOSTIPADDR": hostipaddr,
-              "GUESTIPADDR": hostipaddr,
-              "DEFROUTE": defroutedev,
-              "HOSTNAME": hostname,
-              "ROOT": "/",
-              "USER": dusername,
-              "PASSWORD": dpassword,
-              "DATABASENAME": ddatabase,
-              "HOSTPACKAGER": hostpackager,
-              "GUESTPACKAGER": guestpackager,
-              "GUESTARCH": ARCH,
-              "HOSTARCH": ARCH
-              }
+# host specific values are resolved lazily on first use
+trans_dict = TransDict({"HOSTIPADDR": _hostipaddr,
+                        "GUESTIPADDR": _hostipaddr,
+                        "DEFROUTE": _defroute,
+                        "HOSTNAME": LazyValue(socket.gethostname),
+                        "ROOT": "/",
+                        "USER": dusername,
+                        "PASSWORD": dpassword,
+                        "DATABASENAME": ddatabase,
+                        "HOSTPACKAGER": LazyValue(get_hostpackager),
+                        "GUESTPACKAGER": guestpackager,
+                        "GUESTARCH": _hostarch,
+                        "HOSTARCH": _hostarch
+                        })
+
+
+class FrozenDict(dict):
+    """
+    Read only dictionary, used for objects shared inside whole process (like parsed config)
+    """
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("%s is read only, use copy() to get mutable object" % self.__class__.__name__)
 
+    __setitem__ = __delitem__ = __readonly
+    clear = pop = popitem = setdefault = update = __readonly
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+
+class FrozenList(list):
+    """
+    Read only list, used for objects shared inside whole process (like parsed config)
+    """
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("%s is read only, use list() to get mutable object" % self.__class__.__name__)
+
+    __setitem__ = __delitem__ = __setslice__ = __delslice__ = __readonly
+    __iadd__ = __imul__ = __readonly
+    append = extend = insert = pop = remove = reverse = sort = __readonly
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+
+def freeze(data):
+    """
+    Return read only copy of nested structure of dicts and lists
+
+    :param data: object
+    :return: object
+    """
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value)) for key, value in data.items())
+    if isinstance(data, list):
+        return FrozenList(freeze(value) for value in data)
+    return data
 
 BASEPATHDIR = "/opt"
 PDCURL = "https://pdc.fedoraproject.org/rest_api/v1/unreleasedvariants"
@@ -116,6 +314,75 @@ DEFAULTRETRYCOUNT = 3
 # time in seconds
 DEFAULTRETRYTIMEOUT = 30
 DEFAULTNSPAWNTIMEOUT = 10
+# directory for data shared between test processes
+CACHEDIR = os.path.join(BASEPATHDIR, "mtf_cache")
+# time in seconds, how long is cached moduleMD file used without revalidation
+DEFAULTMODULEMDCACHETTL = 10 * 60
+# longer logged values are truncated and stored to file
+DEFAULTLOGMAXLENGTH = 8 * 1024
+# time in seconds, how long is known state of container (running) trusted without asking docker
+DEFAULTCONTAINERSTATETTL = 5
+# seconds without taken container after which ready containers of pool are removed
+DEFAULTCONTAINERPOOLTTL = 10 * 60
+# maximal number of kept provisioned docker images (base image with installed packages)
+DEFAULTPROVISIONEDIMAGESMAX = 10
+# time in seconds, how long is pulled container image used without pulling it again
+DEFAULTPULLTTL = 60 * 60
+# time in seconds between samples of resource usage of tested machine
+DEFAULTTELEMETRYINTERVAL = 1
+# size limit in MiB of cached root filesystems of nspawn machines
+DEFAULTROOTFSCACHEMAX = 10 * 1024
+# maximal number of commands running at the same time inside module (runParallel)
+DEFAULTPARALLELRUNS = 4
+# architecture names of docker images (inspect) translated to uname -m names
+DOCKERARCHS = {"amd64": "x86_64", "386": "i686", "arm64": "aarch64", "arm": "armv7l"}
+
+
+# process wide registry of parsed config files,
+# key is tuple (realpath, mtime, size) so changed file is parsed again
+_config_registry = {}
+
+
+def get_config():
+    """
+    Read the module's configuration file
+    File is parsed just once per process and shared read only object is returned,
+    it is parsed again in case file changed or invalidate_config was called.
+
+    :default: ``./config.yaml`` in the ``tests`` directory of the module's root directory
+    :envvar: **CONFIG=path/to/file** overrides default value.
+    :return: FrozenDict
+    """
+    import yamlhelper
+    cfgfile = os.environ.get('CONFIG') or './config.yaml'
+    try:
+        realpath = os.path.realpath(cfgfile)
+        cfgstat = os.stat(realpath)
+        key = (realpath, cfgstat.st_mtime, cfgstat.st_size)
+        if key not in _config_registry:
+            with open(realpath, 'r') as ymlfile:
+                xcfg = freeze(yamlhelper.load(ymlfile))
+            invalidate_config(cfgfile)
+            _config_registry[key] = xcfg
+        return _config_registry[key]
+    except (IOError, OSError):
+        raise ConfigExc(
+            "Error: File '%s' doesn't appear to exist or it's not a YAML file." %
+            cfgfile + " " +
+            "Tip: If the CONFIG envvar is not set, mtf-generator looks for './config'.")
+
+
+def invalidate_config(cfgfile=None):
+    """
+    Drop parsed config files from registry, next call of get_config parses file again
+
+    :param cfgfile: path to config file, all files are dropped if not set
+    :return: None
+    """
+    realpath = os.path.realpath(cfgfile) if cfgfile else None
+    for key in _config_registry.keys():
+        if realpath is None or key[0] == realpath:
+            del _config_registry[key]
 
 
 def is_debug():
@@ -126,23 +393,359 @@ def is_not_silent():
     return not is_debug()
 
 
+def get_log_max_length():
+    """
+    Returns maximal length of logged value, longer values are truncated and whole value is stored to file.
+    It is possible to redefine it via MTF_LOG_MAX_LENGTH variable, 0 disables truncation
+
+    :return: int
+    """
+    maxlength = os.environ.get('MTF_LOG_MAX_LENGTH')
+    return int(maxlength) if maxlength else DEFAULTLOGMAXLENGTH
+
+
+def get_if_docker_session():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, commands inside docker container are executed via one long living shell
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_DOCKER_SESSION'))
+
+
+def get_if_reuse_images():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, docker container with installed packages is committed to image
+    and this image is used next time
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_REUSE_IMAGES'))
+
+
+def get_provisioned_images_max():
+    """
+    Returns maximal number of kept provisioned docker images, older are removed.
+    It is possible to redefine it via MTF_PROVISIONED_IMAGES_MAX variable
+
+    :return: int
+    """
+    count = os.environ.get('MTF_PROVISIONED_IMAGES_MAX')
+    return int(count) if count else DEFAULTPROVISIONEDIMAGESMAX
+
+
+def get_container_pool_size():
+    """
+    Returns number of ready docker containers kept in pool, 0 means that pool is not used.
+    It is possible to set it via MTF_CONTAINER_POOL variable
+
+    :return: int
+    """
+    size = os.environ.get('MTF_CONTAINER_POOL')
+    return int(size) if size else 0
+
+
+def get_container_pool_ttl():
+    """
+    Returns how many seconds are ready containers kept in pool when no one takes them.
+    It is possible to set it via MTF_CONTAINER_POOL_TTL variable
+
+    :return: float
+    """
+    ttl = os.environ.get('MTF_CONTAINER_POOL_TTL')
+    return float(ttl) if ttl else DEFAULTCONTAINERPOOLTTL
+
+
+def get_if_log_background():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, log messages are written to output by background thread
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_LOG_BACKGROUND'))
+
+
+class LogMessage(object):
+    """
+    Message of print_info/print_debug, it is formatted just when it is really written.
+    Strings are formatted by trans_dict, strings what are not possible to format (not valid templates,
+    values of trans_dict what fail to resolve) are written as they are, logging never fails on message.
+    Too long values are truncated, whole value is stored to file in MTF_LOG_DIR (in case it is set)
+    """
+
+    def __init__(self, args):
+        self.args = args
+
+    @staticmethod
+    def __format(arg):
+        if isinstance(arg, basestring):
+            try:
+                return arg.format(**trans_dict)
+            except Exception:
+                # it is not template (eg. output of command), print it as is
+                return arg
+        try:
+            return str(arg)
+        except Exception as e:
+            return "<unprintable %s object: %r>" % (type(arg).__name__, e)
+
+    @staticmethod
+    def __truncate(text):
+        maxlength = get_log_max_length()
+        if not maxlength or len(text) <= maxlength:
+            return text
+        logdir = os.environ.get('MTF_LOG_DIR')
+        if not logdir:
+            return "%s\n... (truncated %d characters, set MTF_LOG_DIR to store whole values)" % (
+                text[:maxlength], len(text) - maxlength)
+        try:
+            spillfd, spillpath = tempfile.mkstemp(prefix="mtf-log-", suffix=".txt", dir=logdir)
+            with os.fdopen(spillfd, "w") as spillfile:
+                spillfile.write(text)
+            where = "whole value stored in %s" % spillpath
+        except (IOError, OSError):
+            where = "unable to store whole value"
+        return "%s\n... (truncated %d characters, %s)" % (text[:maxlength], len(text) - maxlength, where)
+
+    def __str__(self):
+        return "\n".join(self.__truncate(self.__format(arg)) for arg in self.args)
+
+
+class StderrHandler(logging.StreamHandler):
+    """
+    Stream handler what writes to sys.stderr valid at time of writing, so that later redirection is respected
+    """
+
+    def __init__(self):
+        logging.StreamHandler.__init__(self, sys.stderr)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class BackgroundHandler(logging.Handler):
+    """
+    Logging handler what passes records to another handler in background thread,
+    so that writing to slow output does not block tests
+    """
+
+    def __init__(self, handler):
+        logging.Handler.__init__(self)
+        self.handler = handler
+        self.queue = Queue.Queue()
+        self.thread = threading.Thread(target=self.__writer, name="mtf-log-writer")
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __writer(self):
+        while True:
+            record = self.queue.get()
+            try:
+                if record is None:
+                    return
+                self.handler.handle(record)
+            finally:
+                self.queue.task_done()
+
+    def emit(self, record):
+        # message (LogMessage) is formatted and truncated by writer thread, not by caller
+        self.queue.put(record)
+
+    def flush(self):
+        self.queue.join()
+        self.handler.flush()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.handler.flush()
+        logging.Handler.close(self)
+
+
+class BackgroundReaper(object):
+    """
+    Run cleanup actions (like removal of containers) in background thread, so that tests do not wait for them.
+    Actions what are not finished are done at process exit (also in processes started by multiprocessing,
+    what do not call atexit handlers)
+    """
+
+    def __init__(self):
+        self.queue = Queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.closed = False
+        atexit.register(self.close)
+        import multiprocessing.util
+        multiprocessing.util.Finalize(None, self.close, exitpriority=10)
+
+    def __worker(self):
+        while True:
+            action = self.queue.get()
+            try:
+                if action is None:
+                    return
+                self.__call(action)
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def __call(action):
+        func, args = action
+        try:
+            func(*args)
+        except Exception as e:
+            print_debug("Background cleanup action failed:", func, args, e)
+
+    def submit(self, func, *args):
+        """
+        Schedule action, it is called directly in case reaper is already closed
+
+        :param func: callable
+        :param args: arguments of func
+        :return: None
+        """
+        with self.lock:
+            if not self.closed:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.__worker, name="mtf-reaper")
+                    self.thread.daemon = True
+                    self.thread.start()
+                self.queue.put((func, args))
+                return
+        self.__call((func, args))
+
+    def close(self):
+        """
+        Finish all scheduled actions, it is called at process exit
+
+        :return: None
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+
+_reaper = None
+
+
+def get_reaper():
+    """
+    Return process wide BackgroundReaper
+
+    :return: BackgroundReaper
+    """
+    global _reaper
+    if _reaper is None:
+        _reaper = BackgroundReaper()
+    return _reaper
+
+
+def get_if_async_teardown():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, containers are removed in background and test does not wait for it
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_ASYNC_TEARDOWN'))
+
+
+def get_if_telemetry():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, resource usage of tested machine is sampled during every test
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_TELEMETRY'))
+
+
+def get_telemetry_interval():
+    """
+    Returns time in seconds between samples of resource usage.
+    It is possible to redefine it via MTF_TELEMETRY_INTERVAL variable
+
+    :return: float
+    """
+    interval = os.environ.get('MTF_TELEMETRY_INTERVAL')
+    return float(interval) if interval else DEFAULTTELEMETRYINTERVAL
+
+
+def get_if_rootfs_cache():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, root filesystem of nspawn machine is cloned from cached template
+    instead of installing packages for every test
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_ROOTFS_CACHE'))
+
+
+def get_if_nspawn_ephemeral():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, nspawn machine boots from overlay of cached template
+    and only its changes are removed after test
+
+    :return: bool
+    """
+    return bool(os.environ.get('MTF_NSPAWN_EPHEMERAL'))
+
+
+def get_rootfs_cache_max():
+    """
+    Returns size limit in MiB of cached root filesystems, least recently used are removed.
+    It is possible to redefine it via MTF_ROOTFS_CACHE_MAX variable
+
+    :return: int
+    """
+    size = os.environ.get('MTF_ROOTFS_CACHE_MAX')
+    return int(size) if size else DEFAULTROOTFSCACHEMAX
+
+
+def get_logger():
+    """
+    Return logger used by print_info and print_debug, it writes to stderr
+    (via background thread in case MTF_LOG_BACKGROUND is set)
+
+    :return: logging.Logger
+    """
+    logger = logging.getLogger("moduleframework")
+    if not logger.handlers:
+        handler = StderrHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        if get_if_log_background():
+            handler = BackgroundHandler(handler)
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(logging.DEBUG if is_debug() else logging.INFO)
+    return logger
+
+
 def print_info(*args):
     """
     Print data to selected output in case you are not in testing class, there is self.log
+    Strings are formatted by using trans_dict, but just in case message is really written
 
     :param args: object
     :return: None
     """
-    for arg in args:
-        out = arg
-        if isinstance(arg, basestring):
-            try:
-                out = arg.format(**trans_dict)
-            except KeyError:
-                raise ModuleFrameworkException(
-                    "String is formatted by using trans_dict, if you want to use brackets { } in your code please use {{ or }}, possible values in trans_dict are:",
-                    trans_dict)
-        print >> sys.stderr, out
+    get_logger().info(LogMessage(args))
 
 
 def print_debug(*args):
@@ -153,8 +756,10 @@ def print_debug(*args):
     :param args: object
     :return: None
     """
-    if is_debug():
-        print_info(*args)
+    logger = get_logger()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(LogMessage(args))
+
 
 def is_recursive_download():
     """
@@ -202,6 +807,77 @@ def get_if_module():
     return not bool(rreps)
 
 
+def get_if_offline():
+    """
+    Returns boolean value in case variable is set.
+    It is used internally in code, cached data are used without network access
+
+    :return: bool
+    """
+    offline = os.environ.get('MTF_OFFLINE')
+    return bool(offline)
+
+
+def get_modulemd_cache_ttl():
+    """
+    Returns time in seconds, how long is cached moduleMD file used without revalidation.
+    It is possible to redefine it via MTF_MODULEMD_CACHE_TTL variable
+
+    :return: int
+    """
+    ttl = os.environ.get('MTF_MODULEMD_CACHE_TTL')
+    return int(ttl) if ttl else DEFAULTMODULEMDCACHETTL
+
+
+def get_container_state_ttl():
+    """
+    Returns time in seconds, how long is state of container trusted without asking docker daemon.
+    It is possible to redefine it via MTF_CONTAINER_STATE_TTL variable, 0 means ask every time
+
+    :return: float
+    """
+    ttl = os.environ.get('MTF_CONTAINER_STATE_TTL')
+    return float(ttl) if ttl else DEFAULTCONTAINERSTATETTL
+
+
+def get_pull_ttl():
+    """
+    Returns time in seconds, how long is pulled container image (or image imported from url) used
+    without fetching it again. It is possible to redefine it via MTF_PULL_TTL variable
+
+    :return: int
+    """
+    ttl = os.environ.get('MTF_PULL_TTL')
+    return int(ttl) if ttl else DEFAULTPULLTTL
+
+
+def format_command(command):
+    """
+    Format command by trans_dict, it is used for commands passed to run methods
+
+    :param command: str
+    :return: str
+    """
+    try:
+        return command.format(**trans_dict)
+    except KeyError:
+        raise ModuleFrameworkException(
+            "Command is formatted by using trans_dict, if you want to use brackets { } in your code please use {{ "
+            "or }}, possible values in trans_dict are:",
+            trans_dict)
+
+
+def argv_to_command(argv):
+    """
+    Return command string what is split back to same argv list (by shlex), no shell is involved.
+    It is used for passing argv lists to avocado.process.run
+
+    :param argv: list of arguments
+    :return: str
+    """
+    return " ".join(pipes.quote(str(arg)) for arg in argv)
+
+
 def normalize_text(text, replacement="_"):
     """
     Improve string, replace all bad characters with another one expecially with "_"
@@ -27,12 +27,12 @@ MODULE for reading data from compose. There are stored:
   module files
 """
 
-import yaml
 import urllib
 import xml.etree.ElementTree
 import gzip
-import tempfile
 import os
+from StringIO import StringIO
+import yamlhelper
 from common import *
 
 
@@ -48,17 +48,9 @@ class ComposeParser(object):
         modulelocaltion = e.findall(
             ".//{http://linux.duke.edu/metadata/repo}data[@type='modules']/{http://linux.duke.edu/metadata/repo}location")[0]
         mdrawlocaltion = modulelocaltion.attrib["href"]
-        response = ''.join(
-            urllib.urlopen(
-                compose +
-                "/" +
-                mdrawlocaltion).readlines())
-        tmpf = tempfile.mkstemp()
-        tmpfo = open(tmpf[1], mode='w+b')
-        tmpfo.write(response)
-        tmpfo.close()
-        self.modules = yaml.load(''.join(gzip.open(tmpf[1]).readlines()))
-        os.remove(tmpf[1])
+        response = urllib.urlopen(compose + "/" + mdrawlocaltion).read()
+        # decompress in memory and parse stream directly, file could have megabytes
+        self.modules = yamlhelper.load(gzip.GzipFile(fileobj=StringIO(response)))
 
     def getModuleList(self):
         """
@@ -88,10 +80,9 @@ class ComposeParser(object):
             if foo['data']['name'] == name:
                 thismodule = foo
         if thismodule:
-            mdo = file(MODULEFILE, mode="w")
-            yaml.dump(foo, mdo)
-            mdo.close()
-            out.append("MODULENAME=%s" % foo['data']['name'])
+            with open(MODULEFILE, mode="w") as mdo:
+                yamlhelper.dump(thismodule, mdo)
+            out.append("MODULENAME=%s" % thismodule['data']['name'])
             out.append("MODULE=%s" % "nspawn")
             out.append("URL=%s" % self.compose)
             out.append("MODULEMDURL=file://%s" % os.path.abspath(MODULEFILE))
@@ -0,0 +1,223 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Pool of started and provisioned docker containers shared by test processes on host.
+
+Pool is identified by key (image, docker run arguments, command, installed packages and their repositories).
+State of container is stored in its name:
+  mtf-filling-<key>-<random>    container is being started and provisioned
+  mtf-pool-<key>-<random>       container is ready to be taken by test
+Test takes container by renaming it (docker rename is atomic, just one process succeeds),
+taken container is removed by test as usual. Pool is refilled by detached process
+(mtf-container-pool fill), so that it survives end of test process. The filler keeps the pool full
+and removes ready containers when no test takes one for MTF_CONTAINER_POOL_TTL seconds.
+All pool containers are removed immediately by mtf-container-pool drain.
+"""
+
+import os
+import sys
+import time
+import uuid
+import fcntl
+import hashlib
+import subprocess
+from avocado.utils import process
+from common import *
+
+POOLPREFIX = "mtf-pool-"
+FILLPREFIX = "mtf-filling-"
+POOLLOCKDIR = os.path.join(CACHEDIR, "pool")
+# seconds between checks of ready containers by filler
+POOLPOLLINTERVAL = 2
+
+
+def pool_key(imageid, args, command, packages, repos=None):
+    """
+    Return key of pool, containers are interchangeable just in case all inputs are same
+
+    :param imageid: str id of image
+    :param args: str docker run arguments
+    :param command: str command of container
+    :param packages: list of installed packages
+    :param repos: list of repository URLs packages are installed from
+    :return: str
+    """
+    return hashlib.sha1("\n".join([imageid, args, command, " ".join(sorted(set(packages))),
+                                   " ".join(repos or [])])).hexdigest()[:16]
+
+
+def _containers(prefix):
+    """
+    Return list of tuples (id, name) of containers with name starting with prefix
+
+    :param prefix: str
+    :return: list
+    """
+    out = process.run("docker ps -a --filter name=%s --format '{{.ID}} {{.Names}}'" % prefix,
+                      shell=True, ignore_status=True, verbose=False)
+    return [tuple(line.split()) for line in out.stdout.splitlines()
+            if len(line.split()) == 2 and line.split()[1].startswith(prefix)]
+
+
+class ContainerPool(object):
+    """
+    Pool of ready containers of one key
+    """
+
+    def __init__(self, key, size):
+        """
+        :param key: str returned by pool_key
+        :param size: number of ready containers
+        """
+        self.key = key
+        self.size = size
+
+    def __lockpath(self):
+        if not os.path.isdir(POOLLOCKDIR):
+            os.makedirs(POOLLOCKDIR)
+        return os.path.join(POOLLOCKDIR, "%s.lock" % self.key)
+
+    def ready(self):
+        """
+        Return list of tuples (id, name) of ready containers
+
+        :return: list
+        """
+        return _containers("%s%s-" % (POOLPREFIX, self.key))
+
+    def take(self, ready=None):
+        """
+        Take ready container from pool
+
+        :param ready: list returned by ready(), it is listed again in case it is not set
+        :return: str id of container, None in case pool is empty
+        """
+        for docker_id, name in (self.ready() if ready is None else ready):
+            if process.run("docker rename %s mtf-taken-%s" % (name, uuid.uuid4().hex[:12]),
+                           ignore_status=True, verbose=False).exit_status == 0:
+                return docker_id
+        return None
+
+    def filling(self):
+        """
+        Return True in case some process fills pool of key (filler holds lock while it runs)
+
+        :return: bool
+        """
+        with open(self.__lockpath(), "a") as lockfile:
+            try:
+                fcntl.flock(lockfile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError:
+                return True
+        return False
+
+    def refill(self, args, command):
+        """
+        Start detached process what fills pool up to its size (in background)
+
+        :param args: str docker run arguments
+        :param command: str command of container
+        :return: None
+        """
+        with open(os.devnull, "r+") as devnull:
+            subprocess.Popen([sys.executable, "-c", "from moduleframework.containerpool import main; main()",
+                              "fill", self.key, str(self.size), args, command],
+                             stdin=devnull, stdout=devnull, stderr=devnull, close_fds=True, preexec_fn=os.setsid)
+
+    def fill(self, helper, args, command, ttl=DEFAULTCONTAINERPOOLTTL):
+        """
+        Start containers via helper whenever there is less than size of ready containers in pool.
+        Ready containers are removed when no one takes a container for ttl seconds.
+        Just one process fills pool of key, others exit immediately
+
+        :param helper: module_framework.ContainerHelper prepared by setUp
+        :param args: str docker run arguments
+        :param command: str command of container
+        :param ttl: seconds
+        :return: number of started containers
+        """
+        with open(self.__lockpath(), "a") as lockfile:
+            try:
+                fcntl.flock(lockfile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError:
+                return 0
+            # containers left by killed filler
+            for docker_id, name in _containers("%s%s-" % (FILLPREFIX, self.key)):
+                process.run("docker rm -f %s" % docker_id, ignore_status=True, verbose=False)
+            started = 0
+            used = time.time()
+            while True:
+                if len(self.ready()) < self.size:
+                    # container was taken (or pool is new)
+                    used = time.time()
+                    suffix = "%s-%s" % (self.key, uuid.uuid4().hex[:12])
+                    helper.docker_id = None
+                    helper.start(args="%s --name %s%s" % (args, FILLPREFIX, suffix), command=command)
+                    process.run("docker rename %s%s %s%s" % (FILLPREFIX, suffix, POOLPREFIX, suffix),
+                                verbose=False)
+                    started += 1
+                elif time.time() - used > ttl:
+                    break
+                else:
+                    time.sleep(POOLPOLLINTERVAL)
+            # pool is not used anymore
+            for docker_id, name in self.ready():
+                process.run("docker rm -f %s" % docker_id, ignore_status=True, verbose=False)
+            return started
+
+
+def drain():
+    """
+    Remove all pool containers (ready and being filled) on host
+
+    :return: number of removed containers
+    """
+    containers = _containers(POOLPREFIX) + _containers(FILLPREFIX)
+    for docker_id, name in containers:
+        process.run("docker rm -f %s" % docker_id, ignore_status=True, verbose=False)
+    return len(containers)
+
+
+def main():
+    from optparse import OptionParser
+    parser = OptionParser(usage="%prog drain | fill KEY SIZE ARGS COMMAND",
+                          description="Manage pool of ready docker containers (MTF_CONTAINER_POOL), "
+                                      "drain removes all pool containers, fill is used internally")
+    (options, args) = parser.parse_args()
+    if args == ["drain"]:
+        print_info("Removed pool containers:", drain())
+    elif len(args) == 5 and args[0] == "fill":
+        import module_framework
+        # filler itself does not take containers from pool
+        os.environ.pop("MTF_CONTAINER_POOL", None)
+        helper = module_framework.ContainerHelper()
+        # containers are prepared same way as containers started by test
+        helper.setUp()
+        ContainerPool(args[1], int(args[2])).fill(helper, args[3], args[4], get_container_pool_ttl())
+    else:
+        parser.error("unknown command")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,466 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Minimal client of Docker Engine API, it talks HTTP over unix socket of docker daemon
+instead of spawning docker command line client for every operation.
+"""
+
+import os
+import json
+import time
+import signal
+import socket
+import struct
+import base64
+import tarfile
+import httplib
+import urllib
+import threading
+from StringIO import StringIO
+from common import *
+
+DOCKERSOCKET = "/var/run/docker.sock"
+# timeout for API calls in seconds (not for exec, it waits for command)
+DEFAULTDOCKERAPITIMEOUT = 60
+
+
+class UnixHTTPConnection(httplib.HTTPConnection):
+    """
+    HTTP connection over unix socket
+    """
+
+    def __init__(self, path, timeout=None):
+        httplib.HTTPConnection.__init__(self, "localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self.sock = sock
+
+
+class DockerExecResult(object):
+    """
+    Structured result of command executed inside container, exit_status is None in case of timeout
+    """
+
+    def __init__(self, command, stdout, stderr, exit_status, duration):
+        self.command = command
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_status = exit_status
+        self.duration = duration
+
+
+def get_docker_socket():
+    """
+    Return path to unix socket of docker daemon, it could be redefined via DOCKER_HOST=unix://path
+
+    :return: str
+    """
+    dockerhost = os.environ.get("DOCKER_HOST") or ""
+    if dockerhost.startswith("unix://"):
+        return dockerhost[7:]
+    return DOCKERSOCKET
+
+
+def is_docker_api_available(path=None):
+    """
+    Return True in case docker daemon socket is accessible
+
+    :param path: path to socket
+    :return: bool
+    """
+    path = path or get_docker_socket()
+    return os.path.exists(path) and os.access(path, os.R_OK | os.W_OK)
+
+
+class DockerClient(object):
+    """
+    Client of docker engine API. Control calls reuse one keep-alive connection,
+    exec streams use own connection, because docker hijacks it for raw stream.
+    """
+
+    def __init__(self, path=None, timeout=DEFAULTDOCKERAPITIMEOUT):
+        self.path = path or get_docker_socket()
+        self.timeout = timeout
+        self.connection = None
+
+    def __getstate__(self):
+        # connection is not possible to pickle (moduleframework-cmd stores helper)
+        state = self.__dict__.copy()
+        state["connection"] = None
+        return state
+
+    def __request(self, method, url, body=None, headers=None, expected=(200, 201, 204)):
+        """
+        Internal method, do request via pooled connection (reconnect once in case it was closed)
+
+        :return: tuple (status, headers, data)
+        """
+        headers = headers or {}
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = UnixHTTPConnection(self.path, timeout=self.timeout)
+            try:
+                self.connection.request(method, url, body, headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                break
+            except (httplib.HTTPException, socket.error) as e:
+                self.connection.close()
+                self.connection = None
+                if attempt == 2 or (body is not None and not isinstance(body, basestring)):
+                    raise ContainerExc("Docker API request failed:", method, url, e)
+        if response.status not in expected:
+            raise ContainerExc("Docker API error:", method, url, response.status, data)
+        return response.status, response, data
+
+    def __json(self, method, url, body=None, expected=(200, 201, 204)):
+        status, response, data = self.__request(method, url, body, expected=expected)
+        return json.loads(data) if data else None
+
+    @staticmethod
+    def __quote(name):
+        return urllib.quote(name, safe="")
+
+    def close(self):
+        """
+        Close pooled connection
+
+        :return: None
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def inspectContainer(self, container):
+        """
+        Return inspect data of container, None in case it does not exist
+
+        :param container: str id or name
+        :return: dict
+        """
+        status, response, data = self.__request(
+            "GET", "/containers/%s/json" % self.__quote(container), expected=(200, 404))
+        return json.loads(data) if status == 200 else None
+
+    def isRunning(self, container):
+        """
+        Return True in case container exists and it is running
+
+        :param container: str id or name
+        :return: bool
+        """
+        info = self.inspectContainer(container)
+        return bool(info and info["State"]["Running"])
+
+    def inspectImage(self, image):
+        """
+        Return inspect data of image
+
+        :param image: str
+        :return: dict
+        """
+        return self.__json("GET", "/images/%s/json" % self.__quote(image))
+
+    def __progress(self, data):
+        """
+        Internal method, check stream of json progress messages (pull, import) for errors
+
+        :return: None
+        """
+        for line in data.splitlines():
+            if line.strip():
+                message = json.loads(line)
+                if message.get("error"):
+                    raise ContainerExc("Docker API error:", message["error"])
+
+    def imageExists(self, image):
+        """
+        Return True in case image is available locally
+
+        :param image: str
+        :return: bool
+        """
+        status, response, data = self.__request("GET", "/images/%s/json" % self.__quote(image),
+                                                expected=(200, 404))
+        return status == 200
+
+    def removeImage(self, image):
+        """
+        Remove image
+
+        :param image: str
+        :return: None
+        """
+        self.__request("DELETE", "/images/%s" % self.__quote(image), expected=(200, 404))
+
+    def commit(self, container, image):
+        """
+        Create image from container, same as docker commit
+
+        :param container: str
+        :param image: str repository:tag
+        :return: str id of image
+        """
+        repository, tag = image.rsplit(":", 1)
+        return self.__json("POST", "/commit?%s" % urllib.urlencode(
+            {"container": container, "repo": repository, "tag": tag}))["Id"]
+
+    def pull(self, image):
+        """
+        Pull image from registry
+
+        :param image: str name[:tag]
+        :return: None
+        """
+        name, tag = image, "latest"
+        if ":" in image.split("/")[-1]:
+            name, tag = image.rsplit(":", 1)
+        status, response, data = self.__request(
+            "POST", "/images/create?%s" % urllib.urlencode({"fromImage": name, "tag": tag}))
+        self.__progress(data)
+
+    def importImage(self, source, repository):
+        """
+        Import image from tarball, it is same as docker import
+
+        :param source: str local path or url of tarball
+        :param repository: str name of created image
+        :return: None
+        """
+        if "://" in source and not source.startswith("file://"):
+            status, response, data = self.__request(
+                "POST", "/images/create?%s" % urllib.urlencode({"fromSrc": source, "repo": repository}))
+        else:
+            path = source[7:] if source.startswith("file://") else source
+            with open(path, "rb") as tarball:
+                status, response, data = self.__request(
+                    "POST", "/images/create?%s" % urllib.urlencode({"fromSrc": "-", "repo": repository}),
+                    body=tarball, headers={"Content-Type": "application/x-tar",
+                                           "Content-Length": str(os.path.getsize(path))})
+        self.__progress(data)
+
+    def createContainer(self, image, command=None, tty=True, stdin=True):
+        """
+        Create and start container, same as docker run -it -d image command
+
+        :param image: str
+        :param command: list of arguments
+        :return: str id of container
+        """
+        config = {"Image": image, "Tty": tty, "OpenStdin": stdin, "AttachStdin": False}
+        if command:
+            config["Cmd"] = command
+        container = self.__json("POST", "/containers/create", config)["Id"]
+        self.__request("POST", "/containers/%s/start" % container)
+        return container
+
+    def stop(self, container, timeout=10):
+        """
+        Stop container
+
+        :param container: str
+        :param timeout: seconds to wait before kill
+        :return: None
+        """
+        self.__request("POST", "/containers/%s/stop?t=%d" % (self.__quote(container), timeout),
+                       expected=(204, 304))
+
+    def remove(self, container, force=False):
+        """
+        Remove container
+
+        :param container: str
+        :param force: kill container in case it is running
+        :return: None
+        """
+        self.__request("DELETE", "/containers/%s?force=%d" % (self.__quote(container), int(force)),
+                       expected=(204, 404))
+
+    def execute(self, container, argv, environment=None, timeout=None):
+        """
+        Execute command inside container, it is same as docker exec container argv
+
+        :param container: str
+        :param argv: list of arguments
+        :param environment: list of VAR=value strings
+        :param timeout: seconds, command is killed in case it is not finished (exit_status is None)
+        :return: DockerExecResult
+        """
+        start = time.time()
+        config = {"Cmd": list(argv), "AttachStdout": True, "AttachStderr": True, "Tty": False}
+        if environment:
+            config["Env"] = environment
+        execid = self.__json("POST", "/containers/%s/exec" % self.__quote(container), config)["Id"]
+        # docker hijacks connection for raw stream, so that it is not possible to reuse it
+        connection = UnixHTTPConnection(self.path)
+        # command is killed after timeout, so that its stream ends
+        killed = []
+        timer = threading.Timer(timeout, self.__killExec, [execid, killed]) if timeout is not None else None
+        try:
+            if timer:
+                timer.start()
+            connection.request("POST", "/exec/%s/start" % execid, json.dumps({"Detach": False, "Tty": False}),
+                               {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            if response.status != 200:
+                raise ContainerExc("Docker API error: exec start", response.status, response.read())
+            stdout, stderr = self.demultiplex(response)
+        finally:
+            if timer:
+                timer.cancel()
+                timer.join()
+            connection.close()
+        if killed:
+            return DockerExecResult(argv, stdout, stderr, None, time.time() - start)
+        exit_status = self.__json("GET", "/exec/%s/json" % execid)["ExitCode"]
+        return DockerExecResult(argv, stdout, stderr, exit_status, time.time() - start)
+
+    def __killExec(self, execid, killed):
+        """
+        Internal method, kill process of exec in case it still runs (called by timer thread,
+        it uses own connection)
+
+        :return: None
+        """
+        try:
+            info = DockerClient(self.path, self.timeout).inspectExec(execid)
+            if info.get("Running") and info.get("Pid"):
+                os.kill(info["Pid"], signal.SIGKILL)
+                killed.append(info["Pid"])
+        except (ContainerExc, OSError) as e:
+            print_debug("Unable to kill command inside container after timeout:", execid, e)
+
+    def inspectExec(self, execid):
+        """
+        Return inspect data of exec (Running, ExitCode, Pid on host)
+
+        :param execid: str
+        :return: dict
+        """
+        return self.__json("GET", "/exec/%s/json" % execid)
+
+    @staticmethod
+    def demultiplex(stream):
+        """
+        Split raw docker stream to stdout and stderr (8 bytes header: stream type, 3x padding, size)
+
+        :param stream: file like object
+        :return: tuple (stdout, stderr)
+        """
+        outputs = {1: [], 2: []}
+        while True:
+            header = stream.read(8)
+            if len(header) < 8:
+                break
+            streamtype, size = struct.unpack(">BxxxL", header)
+            outputs.get(streamtype, outputs[1]).append(stream.read(size))
+        return "".join(outputs[1]), "".join(outputs[2])
+
+    def pathStat(self, container, path):
+        """
+        Return stat of path inside container (name, size, mode), None in case it does not exist
+
+        :param container: str
+        :param path: str
+        :return: dict
+        """
+        status, response, data = self.__request(
+            "HEAD", "/containers/%s/archive?%s" % (self.__quote(container), urllib.urlencode({"path": path})),
+            expected=(200, 404))
+        if status == 404:
+            return None
+        return json.loads(base64.b64decode(response.getheader("X-Docker-Container-Path-Stat")))
+
+    def putArchive(self, container, path, archive):
+        """
+        Extract tar archive to directory inside container
+
+        :param container: str
+        :param path: str directory inside container
+        :param archive: str content of tar archive or file object
+        :return: None
+        """
+        self.__request("PUT", "/containers/%s/archive?%s" % (self.__quote(container),
+                                                             urllib.urlencode({"path": path})),
+                       body=archive, headers={"Content-Type": "application/x-tar"})
+
+    def getArchive(self, container, path):
+        """
+        Return tar archive of path inside container
+
+        :param container: str
+        :param path: str
+        :return: str content of tar archive
+        """
+        status, response, data = self.__request(
+            "GET", "/containers/%s/archive?%s" % (self.__quote(container), urllib.urlencode({"path": path})))
+        return data
+
+    def copyTo(self, container, src, dest):
+        """
+        Copy file or directory from host to container, same semantic as docker cp
+
+        :param container: str
+        :param src: str path on host
+        :param dest: str path inside container
+        :return: None
+        """
+        deststat = self.pathStat(container, dest)
+        # directory has mode bit os.ModeDir (1 << 31) in docker
+        if deststat and deststat["mode"] & (1 << 31):
+            destdir, arcname = dest, os.path.basename(os.path.normpath(src))
+        else:
+            destdir, arcname = os.path.dirname(os.path.normpath(dest)) or "/", os.path.basename(dest)
+        archive = StringIO()
+        tar = tarfile.open(fileobj=archive, mode="w")
+        tar.add(src, arcname=arcname)
+        tar.close()
+        self.putArchive(container, destdir, archive.getvalue())
+
+    def copyFrom(self, container, src, dest):
+        """
+        Copy file or directory from container to host, same semantic as docker cp
+
+        :param container: str
+        :param src: str path inside container
+        :param dest: str path on host
+        :return: None
+        """
+        from tarcopy import extract_archive, UnsafeArchiveError
+        srcname = os.path.basename(os.path.normpath(src))
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, srcname)
+        # archive comes from container, members are checked before extraction
+        try:
+            extract_archive(StringIO(self.getArchive(container, src)), [(srcname, dest)])
+        except UnsafeArchiveError as e:
+            raise ContainerExc("Unable to copy files from container:", src, e)
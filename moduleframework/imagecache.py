@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Bookkeeping of provisioned docker images (base image with installed packages of module profile).
+Images are created by docker commit, this module names them and tracks their usage.
+
+Layout of cache directory:
+  images/<tag>    empty file, modification time is time of last use of image mtf-provisioned:<tag>
+"""
+
+import os
+import hashlib
+from common import *
+
+IMAGECACHEDIR = os.path.join(CACHEDIR, "images")
+PROVISIONEDREPOSITORY = "mtf-provisioned"
+
+
+class ProvisionedImages(object):
+    """
+    Names of provisioned images are derived from digest of base image, installed packages and repositories,
+    so that changed input leads to new image. Least recently used images are pruned.
+    """
+
+    def __init__(self, cachedir=IMAGECACHEDIR, maxcount=None):
+        self.cachedir = cachedir
+        self.maxcount = get_provisioned_images_max() if maxcount is None else maxcount
+
+    def __path(self, tag):
+        return os.path.join(self.cachedir, tag)
+
+    @staticmethod
+    def imageName(basedigest, packages, repos=()):
+        """
+        Return name of provisioned image
+
+        :param basedigest: str id of base image
+        :param packages: list of installed packages
+        :param repos: list of repositories used for installation
+        :return: str repository:tag
+        """
+        key = "\n".join([basedigest, " ".join(sorted(set(packages))), " ".join(sorted(set(repos)))])
+        return "%s:%s" % (PROVISIONEDREPOSITORY, hashlib.sha256(key).hexdigest()[:32])
+
+    def touch(self, image):
+        """
+        Mark image as used now
+
+        :param image: str name returned by imageName
+        :return: None
+        """
+        path = self.__path(image.split(":", 1)[1])
+        try:
+            if not os.path.isdir(self.cachedir):
+                os.makedirs(self.cachedir)
+            with open(path, "a"):
+                os.utime(path, None)
+        except (IOError, OSError) as e:
+            print_debug("Unable to store usage of provisioned image:", image, e)
+
+    def forget(self, image):
+        """
+        Remove image from bookkeeping (for example it was removed from docker)
+
+        :param image: str
+        :return: None
+        """
+        try:
+            os.remove(self.__path(image.split(":", 1)[1]))
+        except OSError:
+            pass
+
+    def prune(self, remove, keep=()):
+        """
+        Remove least recently used images over limit (MTF_PROVISIONED_IMAGES_MAX)
+
+        :param remove: function what removes image from docker, it gets image name
+        :param keep: list of images what are not removed (used by this process)
+        :return: list of removed images
+        """
+        try:
+            tags = [(os.path.getmtime(self.__path(tag)), tag) for tag in os.listdir(self.cachedir)]
+        except OSError:
+            return []
+        removed = []
+        for mtime, tag in sorted(tags, reverse=True)[self.maxcount:]:
+            image = "%s:%s" % (PROVISIONEDREPOSITORY, tag)
+            if image in keep:
+                continue
+            try:
+                remove(image)
+            except Exception as e:
+                print_debug("Unable to remove provisioned image:", image, e)
+                continue
+            self.forget(image)
+            removed.append(image)
+        return removed
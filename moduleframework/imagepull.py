@@ -0,0 +1,262 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Pull (docker pull) or import (docker import) of container images coordinated between processes.
+Every source is fetched under host wide lock and the result is recorded, so that parallel
+tests and jobs do not fetch same image again.
+
+Layout of cache directory:
+  pulls/<sha1 of image>.lock     lock file
+  pulls/<sha1 of source>.json    source, image name, image id, checksum of local tarball and time of fetch
+
+The module is also command line tool (mtf-prewarm) what fetches images of given config files in parallel.
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+from avocado.utils import process
+from common import *
+
+PULLCACHEDIR = os.path.join(CACHEDIR, "pulls")
+
+
+def docker_image_name(source):
+    """
+    Return local image name for container source (registry reference, docker=name or tarball).
+    Tarball (any source containing .tar) is imported by docker import to image testcontainer.
+
+    :param source: str
+    :return: tuple (image name, bool True in case source is tarball)
+    """
+    if "docker=" in source:
+        return source[7:], False
+    if ".tar" in source:
+        return "testcontainer", True
+    return source, False
+
+
+class ImageFetcher(object):
+    """
+    Fetch container images via docker command line client or engine API (dockerapi.DockerClient)
+    """
+
+    def __init__(self, dockerapi=None, cachedir=PULLCACHEDIR):
+        self.dockerapi = dockerapi
+        self.cachedir = cachedir
+
+    def __path(self, source, suffix):
+        return os.path.join(self.cachedir, "%s.%s" % (hashlib.sha1(source).hexdigest(), suffix))
+
+    @contextmanager
+    def lock(self, image):
+        """
+        Host wide lock of local image name (all tarballs are imported to same name),
+        it waits until other process finishes fetch of the same image.
+        In case lock file is not possible to create, it continues without lock
+
+        :param image: str
+        """
+        lockfile = None
+        try:
+            if not os.path.isdir(self.cachedir):
+                os.makedirs(self.cachedir)
+            lockfile = open(self.__path(image, "lock"), "a")
+            fcntl.flock(lockfile, fcntl.LOCK_EX)
+        except (IOError, OSError) as e:
+            print_debug("Unable to lock image, continue without lock:", image, e)
+        try:
+            yield
+        finally:
+            if lockfile:
+                lockfile.close()
+
+    @staticmethod
+    def checksum(source):
+        """
+        Return checksum of local tarball (size and modification time), None for other sources
+
+        :param source: str
+        :return: str
+        """
+        path = source[7:] if source.startswith("file://") else source
+        if ".tar" in source and "://" not in path and os.path.isfile(path):
+            stat = os.stat(path)
+            return "%d-%d" % (stat.st_size, stat.st_mtime)
+        return None
+
+    def __readRecord(self, source):
+        try:
+            with open(self.__path(source, "json")) as recordfile:
+                return json.load(recordfile)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def __writeRecord(self, source, record):
+        try:
+            with open(self.__path(source, "json") + ".tmp", "w") as recordfile:
+                json.dump(record, recordfile)
+            os.rename(self.__path(source, "json") + ".tmp", self.__path(source, "json"))
+        except (IOError, OSError) as e:
+            print_debug("Unable to store image record:", source, e)
+
+    def inspect(self, image):
+        """
+        Return inspect data of local image, None in case it does not exist
+
+        :param image: str
+        :return: dict
+        """
+        if self.dockerapi:
+            return self.dockerapi.inspectImage(image) if self.dockerapi.imageExists(image) else None
+        out = process.run("docker inspect --type image %s" % image, ignore_status=True, verbose=False)
+        return json.loads(out.stdout)[0] if out.exit_status == 0 else None
+
+    def __fetch(self, source, image, tarbased):
+        """
+        Internal method, do not use it anyhow
+
+        :return: None
+        """
+        if self.dockerapi:
+            if tarbased:
+                self.dockerapi.importImage(source, image)
+            else:
+                self.dockerapi.pull(image)
+        elif tarbased:
+            process.run("docker import %s %s" % (source, image), verbose=is_not_silent())
+        else:
+            process.run("docker pull %s" % image, verbose=is_not_silent())
+
+    def fetch(self, source, image=None, tarbased=None):
+        """
+        Make image of source available locally. It is fetched just in case there is no valid record:
+        image id has to be same as recorded one, local tarball has to be unchanged and
+        other sources are fetched again after MTF_PULL_TTL.
+
+        :param source: str registry reference, docker=name, path or url of tarball
+        :param image: str local image name, derived from source by default
+        :param tarbased: bool source is tarball, derived from source by default
+        :return: dict inspect data of image
+        """
+        if image is None:
+            image, tarbased = docker_image_name(source)
+        if "docker=" in source:
+            # local image, nothing to fetch
+            info = self.inspect(image)
+            if info is None:
+                raise ContainerExc("Local docker image does not exist:", image)
+            return info
+        with self.lock(image):
+            record = self.__readRecord(source)
+            checksum = self.checksum(source)
+            if record and record.get("image") == image and record.get("checksum") == checksum and \
+                    (checksum or time.time() - record.get("fetched", 0) < get_pull_ttl()):
+                info = self.inspect(image)
+                if info and info["Id"] == record.get("id"):
+                    print_debug("Image is already fetched:", source, image)
+                    return info
+            self.__fetch(source, image, tarbased)
+            info = self.inspect(image)
+            if info is None:
+                raise ContainerExc("Image is not available after fetch:", source, image)
+            self.__writeRecord(source, {"source": source, "image": image, "id": info["Id"],
+                                        "checksum": checksum, "fetched": time.time()})
+            return info
+
+
+def prewarm(sources, jobs=4):
+    """
+    Fetch images of sources in parallel (via docker command line client)
+
+    :param sources: list of container sources
+    :param jobs: number of parallel fetches
+    :return: dict source: exception for failed sources
+    """
+    pending = list(sources)
+    failures = {}
+    guard = threading.Lock()
+
+    def worker():
+        fetcher = ImageFetcher()
+        while True:
+            with guard:
+                if not pending:
+                    return
+                source = pending.pop(0)
+            try:
+                start = time.time()
+                fetcher.fetch(source)
+                print_info("Image ready:", source, "%.1fs" % (time.time() - start))
+            except Exception as e:
+                with guard:
+                    failures[source] = e
+
+    threads = [threading.Thread(target=worker) for foo in range(max(1, min(jobs, len(pending))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return failures
+
+
+def config_sources(configfiles):
+    """
+    Return container sources (module.docker.container) of config files, without duplicates
+
+    :param configfiles: list of paths to config.yaml files
+    :return: list
+    """
+    import yamlhelper
+    sources = []
+    for configfile in configfiles:
+        with open(configfile) as config:
+            source = (((yamlhelper.load(config) or {}).get("module") or {}).get("docker") or {}).get("container")
+        if source and source not in sources:
+            sources.append(source)
+    return sources
+
+
+def main():
+    from optparse import OptionParser
+    parser = OptionParser(usage="%prog [-j JOBS] CONFIG [CONFIG ...]",
+                          description="Fetch docker images of module config files before tests start")
+    parser.add_option("-j", "--jobs", type="int", dest="jobs", default=4,
+                      help="number of parallel fetches")
+    (options, args) = parser.parse_args()
+    if not args:
+        parser.error("at least one config file is needed")
+    failures = prewarm(config_sources(args), jobs=options.jobs)
+    for source in failures:
+        print_info("Unable to fetch image:", source, failures[source])
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -27,20 +27,13 @@ what you should use for your tests (inherited)
 """
 
 import re
-import shutil
-import yaml
-import json
-import urllib
-import glob
 from avocado import Test
 from avocado.core import exceptions
-from avocado.utils import service
 from avocado.utils import process
-from compose_info import ComposeParser
-import pdc_data
 from common import *
-from timeoutlib import Retry
+from timeoutlib import Retry, wait_for
 import time
+import threading
 import warnings
 PROFILE = None
 
@@ -59,12 +52,75 @@ def skipTestIf(value, text="Test not intended for this module profile"):
             "DEPRECATED, don't use this skip, use self.cancel() inside test function, or self.skip() in setUp()")
 
 
+class ProfileIndex(object):
+    """
+    Index of packages of module, it maps profiles from moduleMD file to frozen sets of packages
+    and contains default list of packages what has to be installed inside module
+    (from packages section of config, or from actual profile of moduleMD file).
+    It is built once per moduleMD file, lookups do not walk moduleMD file again.
+    """
+
+    def __init__(self, modulemd=None, config=None, profile="default", basepackages=None):
+        """
+        :param modulemd: dict of moduleMD file, could be None when it is not needed
+        :param config: dict of config file
+        :param profile: name of actual profile
+        :param basepackages: list of base packages (for bootstrapping of module)
+        """
+        self.modulemd = modulemd
+        profiles = ((modulemd or {}).get('data') or {}).get('profiles') or {}
+        self.profilelists = dict((name, tuple(self.__unique((profiles[name] or {}).get('rpms') or [])))
+                                 for name in profiles)
+        self.profiles = dict((name, frozenset(self.profilelists[name])) for name in self.profilelists)
+        self.basepackages = frozenset(basepackages or [])
+        if config and 'packages' in config:
+            packages = config['packages'] or {}
+            out = list(packages.get('rpms') or [])
+            for name in packages.get('profiles') or []:
+                out += self.getProfile(name)
+            self.packages = tuple(self.__unique(out))
+        elif profile in self.profilelists:
+            self.packages = self.profilelists[profile]
+        else:
+            # fallback solution when it is not known what to install
+            self.packages = ("bash",)
+        self.packageset = frozenset(self.packages)
+
+    @staticmethod
+    def __unique(packages):
+        seen = set()
+        return [x for x in packages if not (x in seen or seen.add(x))]
+
+    def getProfile(self, profile):
+        """
+        Return ordered tuple of packages of profile
+
+        :param profile: str
+        :return: tuple
+        """
+        try:
+            return self.profilelists[profile]
+        except KeyError:
+            raise ConfigExc("Profile %s is not defined in moduleMD file" % profile)
+
+    def getInstallSet(self):
+        """
+        Return set of packages what has to be installed inside module, including base packages
+
+        :return: frozenset
+        """
+        return self.packageset | self.basepackages
+
+
 class CommonFunctions(object):
     """
     Basic class doing configuration reading and allow do commands on host machine
     """
     config = None
     modulemdConf = None
+    profileindex = None
+    # run method is safe to be called from more threads at the same time
+    concurrentrun = False
 
     def __init__(self, *args, **kwargs):
         self.config = None
@@ -72,36 +128,45 @@ class CommonFunctions(object):
         self.moduleName = None
         self.source = None
         self.arch = None
+        self.profileindex = None
         self.dependencylist = {}
+        # telemetry.ResourceMonitor of actual test (MTF_TELEMETRY)
+        self.telemetry = None
         # general use case is to have forwarded services to host (so thats why it is same)
-        self.ipaddr = trans_dict["HOSTIPADDR"]
-        trans_dict["GUESTARCH"] = self.getArch()
+        self.ipaddrkey = "HOSTIPADDR"
+
+    @property
+    def ipaddr(self):
+        """
+        ip address of module, it is looked up in trans_dict (item ipaddrkey) on access,
+        so that host network is not probed until the address is needed
+
+        :return: str
+        """
+        return trans_dict[self.ipaddrkey]
 
     def getArch(self):
         """
-        get system architecture string
+        get system architecture string, it is host architecture by default
 
         :return: str
         """
-        out = self.runHost(command='uname -m', verbose=False).stdout.strip()
-        return out
+        return trans_dict["HOSTARCH"]
 
-    def runHost(self, command="ls /", **kwargs):
+    def runHost(self, command="ls /", argv=None, **kwargs):
         """
         Run commands on host
 
         :param command: command to exectute
+        :param argv: list of arguments, in case it is set, it is executed directly (no shell, no
+                     formatting via trans_dict) and command is ignored
         :param kwargs: (avocado process.run) params like: shell, ignore_status, verbose
         :return: avocado.process.run
         """
-        try:
-            formattedcommand = command.format(**trans_dict)
-        except KeyError:
-            raise ModuleFrameworkException(
-                "Command is formatted by using trans_dict, if you want to use brackets { } in your code please use {{ "
-                "or }}, possible values in trans_dict are:",
-                trans_dict)
-        return process.run("%s" % formattedcommand, **kwargs)
+        if argv is not None:
+            kwargs["shell"] = False
+            return process.run(argv_to_command(argv), **kwargs)
+        return process.run("%s" % format_command(command), **kwargs)
 
     def installTestDependencies(self, packages=None):
         """
@@ -146,6 +211,25 @@ class CommonFunctions(object):
         except ValueError:
             pass
 
+    def getProfileIndex(self, withmodulemd=False):
+        """
+        Return index of packages of module profiles, it is built just once.
+        ModuleMD file is loaded only when it is needed for default package list or withmodulemd is set
+
+        :param withmodulemd: bool, index has to contain all profiles from moduleMD file
+        :return: ProfileIndex
+        """
+        if self.config is None:
+            self.loadconfig()
+        withmodulemd = withmodulemd or 'packages' not in self.config or bool(
+            (self.config['packages'] or {}).get('profiles'))
+        if self.profileindex is None or (withmodulemd and self.profileindex.modulemd is None):
+            modulemd = self.getModulemdYamlconfig() if withmodulemd else None
+            self.profileindex = ProfileIndex(modulemd, self.config, get_correct_profile(),
+                                             getattr(self, "bootstrappackages", None))
+            print_info("PCKGs to install inside module:", list(self.profileindex.packages))
+        return self.profileindex
+
     def getPackageList(self, profile=None):
         """
         Return list of packages what has to be installed inside module
@@ -153,28 +237,9 @@ class CommonFunctions(object):
         :param profile: get list for intended profile instead of default method for searching
         :return: list of packages (rpms)
         """
-        out = []
-        if not profile:
-            if 'packages' in self.config:
-                packages_rpm = self.config['packages'].get('rpms') if self.config[
-                    'packages'].get('rpms') else []
-                packages_profiles = []
-                for x in self.config['packages'].get('profiles') if self.config[
-                    'packages'].get('profiles') else []:
-                    packages_profiles = packages_profiles + \
-                                        self.getModulemdYamlconfig()['data']['profiles'][x]['rpms']
-                out += packages_rpm + packages_profiles
-
-            elif self.getModulemdYamlconfig()['data'].get('profiles') and self.getModulemdYamlconfig()['data'][
-                'profiles'].get(get_correct_profile()):
-                out += self.getModulemdYamlconfig()['data']['profiles'][get_correct_profile()]['rpms']
-            else:
-                # fallback solution when it is not known what to install
-                out.append("bash")
-        else:
-            out += self.getModulemdYamlconfig()['data']['profiles'][profile]['rpms']
-        print_info("PCKGs to install inside module:", out)
-        return out
+        if profile:
+            return list(self.getProfileIndex(withmodulemd=True).getProfile(profile))
+        return list(self.getProfileIndex().packages)
 
     def getModuleDependencies(self):
         return self.dependencylist
@@ -183,15 +248,15 @@ class CommonFunctions(object):
         """
         Return moduleMD file yaml object.
         It can be used also for loading another yaml file via url parameter
+        Files are downloaded and parsed via persistent cache shared between test processes (modulemd_cache)
 
         :param urllink: load this url instead of default one defined in config, or redefined by vaiable CONFIG
         :return: dict
         """
         try:
             if urllink:
-                ymlfile = urllib.urlopen(urllink)
-                cconfig = yaml.load(ymlfile)
-                link = cconfig
+                from modulemd_cache import get_modulemd
+                link = get_modulemd(urllink)
             elif not get_if_module():
                 trans_dict["GUESTPACKAGER"] = "yum -y"
                 link = {"data": {}}
@@ -201,8 +266,8 @@ class CommonFunctions(object):
                 if not self.modulemdConf:
                     modulemd = get_correct_modulemd()
                     if modulemd:
-                        ymlfile = urllib.urlopen(modulemd)
-                        self.modulemdConf = yaml.load(ymlfile)
+                        from modulemd_cache import get_modulemd
+                        self.modulemdConf = get_modulemd(modulemd)
                 link = self.modulemdConf
             return link
         except IOError as e:
@@ -217,7 +282,108 @@ class CommonFunctions(object):
         """
         return self.ipaddr
 
+    def getMainPid(self):
+        """
+        Return pid (on host) of main process of tested machine, None in case module type does not have machine
 
+        :return: int
+        """
+        return None
+
+    def attachTelemetry(self):
+        """
+        Start sampling of resource usage of started machine in case telemetry is enabled (MTF_TELEMETRY).
+        It is called by module type when machine is started
+
+        :return: None
+        """
+        if self.telemetry:
+            pid = self.getMainPid()
+            if pid:
+                self.telemetry.attach(pid)
+
+    def copyToMany(self, pairs):
+        """
+        Copy many files or directory trees to module, destination is exact path of copied item.
+        Module types what are not able to do it in one transfer call copyTo for every item
+
+        :param pairs: list of tuples (path on host, path inside module)
+        :return: tarcopy.TransferStats
+        """
+        from tarcopy import TransferStats, tree_size
+        start = time.time()
+        stats = TransferStats()
+        for src, dest in pairs:
+            self.copyTo(src, dest)
+            files, size = tree_size(src)
+            stats.files += files
+            stats.bytes += size
+        stats.duration = time.time() - start
+        print_debug("Copied to module:", stats)
+        return stats
+
+    def copyFromMany(self, pairs):
+        """
+        Copy many files or directory trees from module, destination is exact path of copied item.
+        Module types what are not able to do it in one transfer call copyFrom for every item
+
+        :param pairs: list of tuples (path inside module, path on host)
+        :return: tarcopy.TransferStats
+        """
+        from tarcopy import TransferStats, tree_size
+        start = time.time()
+        stats = TransferStats()
+        for src, dest in pairs:
+            self.copyFrom(src, dest)
+            files, size = tree_size(dest)
+            stats.files += files
+            stats.bytes += size
+        stats.duration = time.time() - start
+        print_debug("Copied from module:", stats)
+        return stats
+
+    def runParallel(self, commands, maxworkers=DEFAULTPARALLELRUNS, **kwargs):
+        """
+        Run independent commands inside module, at most maxworkers of them at the same time.
+        Module types what are not able to run commands concurrently run them one by one.
+        Failures are raised after all commands finished: ParallelRunExc lists every failed command,
+        its attribute results contains results of all commands (None for failed ones) and failures
+        maps index of every failed command to its exception (e.g. process.CmdError).
+
+        :param commands: list of str commands
+        :param maxworkers: maximal number of running commands
+        :param kwargs: dict parameters passed to run (like ignore_status)
+        :return: list of avocado.process.CmdResult in same order as commands
+        """
+        pending = list(enumerate(commands))
+        results = [None] * len(commands)
+        failures = [None] * len(commands)
+        guard = threading.Lock()
+
+        def worker():
+            while True:
+                with guard:
+                    if not pending:
+                        return
+                    index, command = pending.pop(0)
+                try:
+                    results[index] = self.run(command, **kwargs)
+                except Exception as e:
+                    failures[index] = e
+
+        workers = max(1, min(maxworkers, len(pending))) if self.concurrentrun else 1
+        if workers == 1:
+            worker()
+        else:
+            threads = [threading.Thread(target=worker) for foo in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        failed = dict((index, failure) for index, failure in enumerate(failures) if failure is not None)
+        if failed:
+            raise ParallelRunExc(commands, results, failed)
+        return results
 
 
 class ContainerHelper(CommonFunctions):
@@ -226,7 +392,6 @@ class ContainerHelper(CommonFunctions):
 
     :avocado: disable
     """
-
     def __init__(self):
         """
         set basic object variables
@@ -236,23 +401,20 @@ class ContainerHelper(CommonFunctions):
         self.info = self.config['module']['docker']
         self.tarbased = None
         self.jmeno = None
+        self.imageid = None
         self.docker_id = None
+        self.guestarch = None
+        self.imagearch = None
+        self.dockerapi = None
+        # usable package managers inside image, they are probed once per image of this helper, key is image id
+        self.packagers = {}
+        # tuple (docker_id, running, timestamp), see status()
+        self.containerstate = None
+        self.shellsession = None
         self.icontainer = get_correct_url(
         ) if get_correct_url() else self.info['container']
-        if ".tar" in self.icontainer:
-            self.jmeno = "testcontainer"
-            self.tarbased = True
-        if "docker=" in self.icontainer:
-            self.jmeno = self.icontainer[7:]
-            self.tarbased = False
-        elif "docker.io" in self.info['container']:
-            # Trusted source
-            self.tarbased = False
-            self.jmeno = self.icontainer
-        else:
-            # untrusted source
-            self.tarbased = False
-            self.jmeno = self.icontainer
+        from imagepull import docker_image_name
+        self.jmeno, self.tarbased = docker_image_name(self.icontainer)
 
     def getURL(self):
         """
@@ -284,6 +446,7 @@ class ContainerHelper(CommonFunctions):
         self.__callSetupFromConfig()
         self.__prepare()
         self.__prepareContainer()
+        self.__selectTransport()
         self.__pullContainer()
 
     def tearDown(self):
@@ -318,28 +481,74 @@ class ContainerHelper(CommonFunctions):
                     myfile.write(
                         "INSECURE_REGISTRY='--insecure-registry $REGISTRY %s'" %
                         registry)
+        from avocado.utils import service
         service_manager = service.ServiceManager()
         service_manager.start('docker')
 
+    def __selectTransport(self):
+        """
+        Internal method, do not use it anyhow
+        Select how to communicate with docker daemon, engine API (transport: api in docker section of config,
+        or MTF_DOCKER_TRANSPORT=api) or docker command line client (default, fallback)
+
+        :return: None
+        """
+        from dockerapi import DockerClient, is_docker_api_available
+        transport = os.environ.get("MTF_DOCKER_TRANSPORT") or self.info.get("transport") or "cli"
+        if transport == "api":
+            if is_docker_api_available():
+                self.dockerapi = DockerClient()
+            else:
+                print_info("Docker API socket is not accessible, using docker command line client")
+
     def __pullContainer(self):
         """
         Internal method, do not use it anyhow
 
         :return: None
         """
-        if self.tarbased:
-            self.runHost(
-                "docker import %s %s" %
-                (self.icontainer, self.jmeno), verbose=is_not_silent())
-        elif "docker=" in self.icontainer:
-            pass
-        else:
-            self.runHost("docker pull %s" % self.jmeno, verbose=is_not_silent())
+        from imagepull import ImageFetcher
+        imageinfo = ImageFetcher(dockerapi=self.dockerapi).fetch(self.icontainer, self.jmeno, self.tarbased)
+        self.imageid = imageinfo["Id"]
+        self.containerInfo = imageinfo["Config"]
+        self.imagearch = imageinfo.get("Architecture")
 
-        self.containerInfo = json.loads(
-            self.runHost(
-                "docker inspect %s" %
-                self.jmeno, verbose=is_not_silent()).stdout)[0]["Config"]
+    def __imageExists(self, image):
+        """
+        Internal method, do not use it anyhow
+
+        :return: bool
+        """
+        if self.dockerapi:
+            return self.dockerapi.imageExists(image)
+        return self.runHost(argv=["docker", "inspect", "--type", "image", image],
+                            ignore_status=True, verbose=False).exit_status == 0
+
+    def __removeImage(self, image):
+        """
+        Internal method, do not use it anyhow
+
+        :return: None
+        """
+        if self.dockerapi:
+            return self.dockerapi.removeImage(image)
+        self.runHost(argv=["docker", "rmi", image], verbose=is_not_silent())
+
+    def __commitProvisioned(self, image):
+        """
+        Internal method, do not use it anyhow
+        Store running container with installed packages as image and remove least recently used ones
+
+        :return: None
+        """
+        from imagecache import ProvisionedImages
+        if self.dockerapi:
+            self.dockerapi.commit(self.docker_id, image)
+        else:
+            self.runHost(argv=["docker", "commit", self.docker_id, image], verbose=is_not_silent())
+        images = ProvisionedImages()
+        images.touch(image)
+        images.prune(self.__removeImage, keep=[image])
 
     def start(self, args="-it -d", command="/bin/bash"):
         """
@@ -350,39 +559,170 @@ class ContainerHelper(CommonFunctions):
         :return: None
         """
         if not self.status():
-            if 'start' in self.info and self.info['start']:
-                self.docker_id = self.runHost(
-                    "%s -d %s" %
-                    (self.info['start'], self.jmeno), shell=True, ignore_bg_processes=True,
-                    verbose=is_not_silent()).stdout
+            self.docker_id = self.__takeFromPool(args, command)
+            if self.docker_id:
+                print_info("Container taken from pool", self.docker_id)
+                self.guestarch = None
+                trans_dict["GUESTARCH"] = LazyValue(self.getArch)
             else:
-                self.docker_id = self.runHost(
-                    "docker run %s %s %s" %
-                    (args, self.jmeno, command), shell=True, ignore_bg_processes=True, verbose=is_not_silent()).stdout
-            self.docker_id = self.docker_id.strip()
-            if self.getPackageList():
-                a = self.run(
-                    "%s install %s" %
-                    (trans_dict["HOSTPACKAGER"], " ".join(
-                        self.getPackageList())),
-                    ignore_status=True, verbose=False)
-                b = self.run(
-                    "%s install %s" %
-                    (trans_dict["GUESTPACKAGER"], " ".join(
-                        self.getPackageList())),
-                    ignore_status=True, verbose=False)
-                if a.exit_status == 0:
-                    print_info("Packages installed via {HOSTPACKAGER}", a.stdout)
-                elif b.exit_status == 0:
-                    print_info("Packages installed via {GUESTPACKAGER}", b.stdout)
-                else:
-                    print_info(
-                        "Nothing installed (nor via {HOSTPACKAGER} nor {GUESTPACKAGER}), but package list is not empty",
-                        self.getPackageList())
-        if self.status() is False:
-            raise ContainerExc(
-                "Container %s (for module %s) is not running, probably DEAD immediately after start (ID: %s)" % (
-                    self.jmeno, self.moduleName, self.docker_id))
+                self.__startContainer(args, command)
+            if self.status(force=True) is False:
+                raise ContainerExc(
+                    "Container %s (for module %s) is not running, probably DEAD immediately after start (ID: %s)" % (
+                        self.jmeno, self.moduleName, self.docker_id))
+            self.attachTelemetry()
+
+    def getMainPid(self):
+        """
+        Return pid (on host) of main process of container
+
+        :return: int
+        """
+        if not self.docker_id:
+            return None
+        if self.dockerapi:
+            info = self.dockerapi.inspectContainer(self.docker_id)
+            return info["State"]["Pid"] if info else None
+        out = self.runHost(argv=["docker", "inspect", "--format", "{{.State.Pid}}", self.docker_id],
+                           ignore_status=True, verbose=False)
+        return int(out.stdout.strip()) if out.exit_status == 0 and out.stdout.strip().isdigit() else None
+
+    def __startContainer(self, args, command):
+        """
+        Internal method, do not use it anyhow
+        Start new container and install packages of profile inside
+
+        :return: None
+        """
+        image = self.jmeno
+        packages = self.getPackageList()
+        provisioned = None
+        if packages and self.imageid and get_if_reuse_images():
+            from imagecache import ProvisionedImages
+            provisioned = ProvisionedImages.imageName(self.imageid, packages, self.__provisionRepos())
+            if self.__imageExists(provisioned):
+                print_info("Packages are already installed in provisioned image", provisioned)
+                ProvisionedImages().touch(provisioned)
+                image = provisioned
+                packages = []
+        if 'start' in self.info and self.info['start']:
+            self.docker_id = self.runHost(
+                "%s -d %s" %
+                (self.info['start'], image), shell=True, ignore_bg_processes=True,
+                verbose=is_not_silent()).stdout
+        elif self.dockerapi and args == "-it -d":
+            import shlex
+            self.docker_id = self.dockerapi.createContainer(image, shlex.split(command))
+        else:
+            self.docker_id = self.runHost(
+                "docker run %s %s %s" %
+                (args, image, command), shell=True, ignore_bg_processes=True, verbose=is_not_silent()).stdout
+        self.docker_id = self.docker_id.strip()
+        # architecture is taken from image when it is used first time
+        self.guestarch = None
+        trans_dict["GUESTARCH"] = LazyValue(self.getArch)
+        if packages and self.__installPackages(image, packages) and provisioned:
+            self.__commitProvisioned(provisioned)
+
+    def __takeFromPool(self, args, command):
+        """
+        Internal method, do not use it anyhow
+        Take ready container from pool (MTF_CONTAINER_POOL) and start refill of pool in background
+        in case the pool is not full and no other process fills it
+
+        :return: str id of container, None in case pool is not used or it is empty
+        """
+        size = get_container_pool_size()
+        if not size or not self.imageid or self.info.get('start'):
+            return None
+        from containerpool import ContainerPool, pool_key
+        pool = ContainerPool(pool_key(self.imageid, args, command, self.getPackageList(),
+                                      self.__provisionRepos()), size)
+        ready = pool.ready()
+        docker_id = pool.take(ready)
+        if (docker_id or len(ready) < size) and not pool.filling():
+            pool.refill(args, command)
+        return docker_id
+
+    def __provisionRepos(self):
+        """
+        Internal method, do not use it anyhow
+        Return list of repository URLs what installed packages come from (URL, COMPOSEURL,
+        compose-url and repo/repos of rpm section), config without rpm section has no repositories
+
+        :return: list
+        """
+        rpm = (self.config.get("module") or {}).get("rpm") or {}
+        repos = []
+        for value in [get_correct_url(), os.environ.get("COMPOSEURL"), self.config.get("compose-url"),
+                      rpm.get("repo"), rpm.get("repos")]:
+            for repo in [value] if isinstance(value, basestring) else list(value or []):
+                if repo and repo not in repos:
+                    repos.append(repo)
+        return repos
+
+    def __getPackagers(self, image):
+        """
+        Internal method, do not use it anyhow
+        Return package manager commands usable inside container in order they are tried,
+        they are probed once per image (its id, rebuilt image with same name is probed again)
+
+        :return: list, empty in case there is no known package manager
+        """
+        image = self.imageid or image
+        if image not in self.packagers:
+            candidates = []
+            for packager in [trans_dict["HOSTPACKAGER"], "dnf -y", "yum -y", trans_dict["GUESTPACKAGER"]]:
+                if packager not in candidates:
+                    candidates.append(packager)
+            found = self.run(argv=["bash", "-c", "command -v %s" % " ".join(
+                packager.split()[0] for packager in candidates)], ignore_status=True, verbose=False).stdout
+            found = [os.path.basename(line.strip()) for line in found.splitlines()]
+            self.packagers[image] = [packager for packager in candidates if packager.split()[0] in found]
+        return self.packagers[image]
+
+    def __missingPackages(self, packages):
+        """
+        Internal method, do not use it anyhow
+        Return packages what are not installed inside container, all of them are asked by one rpm query
+
+        :return: list
+        """
+        out = self.run(argv=["rpm", "-q", "--whatprovides"] + list(packages), ignore_status=True, verbose=False)
+        if out.exit_status == 0:
+            return []
+        missing = set(re.findall("^(?:no package provides|package) (\\S+)(?: is not installed)?$",
+                                 out.stdout, re.MULTILINE))
+        if not missing:
+            # rpm is not available or output is not known, install everything
+            return list(packages)
+        return [package for package in packages if package in missing]
+
+    def __installPackages(self, image, packages):
+        """
+        Internal method, do not use it anyhow
+        Install packages what are not installed yet inside container by package manager found in image,
+        next usable package manager (e.g. {GUESTPACKAGER}) is tried in case installation fails
+
+        :return: bool True in case something was installed
+        """
+        missing = self.__missingPackages(packages)
+        if not missing:
+            print_info("Packages are already installed in image", image, packages)
+            return False
+        packagers = self.__getPackagers(image)
+        for packager in list(packagers):
+            out = self.run("%s install %s" % (packager, " ".join(missing)), ignore_status=True, verbose=False)
+            if out.exit_status == 0:
+                print_info("Packages installed via", packager, out.stdout)
+                # working package manager is tried first next time
+                packagers.remove(packager)
+                packagers.insert(0, packager)
+                return True
+            print_debug("Installation failed via", packager, out.stderr)
+        print_info("Nothing installed (no usable package manager found or installation failed), "
+                   "but package list is not empty", missing)
+        return False
 
     def stop(self):
         """
@@ -390,40 +730,177 @@ class ContainerHelper(CommonFunctions):
 
         :return: None
         """
-        if self.status():
+        self.__closeSession()
+        if get_if_async_teardown():
+            if self.docker_id:
+                # test is detached from container immediately, it is killed and removed in background
+                get_reaper().submit(self.__forceRemove, self.docker_id,
+                                    self.dockerapi.path if self.dockerapi else None)
+                self.docker_id = None
+                self.invalidateStatus()
+            return
+        if self.status(force=True):
             try:
+                if self.dockerapi:
+                    self.dockerapi.stop(self.docker_id)
+                    self.dockerapi.remove(self.docker_id)
+                    return
                 self.runHost("docker stop %s" % self.docker_id, verbose=is_not_silent())
                 self.runHost("docker rm %s" % self.docker_id, verbose=is_not_silent())
             except Exception as e:
                 print_debug(e, "docker already removed")
                 pass
+            finally:
+                self.invalidateStatus()
 
-    def status(self):
+    @staticmethod
+    def __forceRemove(docker_id, dockerapipath=None):
         """
-        get status if container is running
+        Internal method, do not use it anyhow
+        Kill and remove container, it is called from background thread (own API connection is used)
 
-        :return: bool
+        :return: None
         """
-        if self.docker_id and self.docker_id[
-                              : 12] in self.runHost(
-            "docker ps", shell=True, verbose=is_not_silent()).stdout:
-            return True
+        if dockerapipath:
+            from dockerapi import DockerClient
+            client = DockerClient(dockerapipath)
+            client.remove(docker_id, force=True)
+            client.close()
         else:
+            process.run("docker rm -f %s" % docker_id, verbose=False)
+
+    def status(self, force=False):
+        """
+        get status if container is running. State is asked just for this container (inspect) and it is
+        trusted for short time (MTF_CONTAINER_STATE_TTL), so that not every command asks docker daemon.
+
+        :param force: ask docker daemon every time
+        :return: bool
+        """
+        if not self.docker_id:
             return False
+        if force or not self.containerstate or self.containerstate[0] != self.docker_id or \
+                time.time() - self.containerstate[2] > get_container_state_ttl():
+            self.containerstate = (self.docker_id, self.__inspectRunning(), time.time())
+        return self.containerstate[1]
+
+    def invalidateStatus(self):
+        """
+        Forget known state of container, next status() asks docker daemon.
+        It is called in case command inside container failed (container could die)
+
+        :return: None
+        """
+        self.containerstate = None
+
+    def __inspectRunning(self):
+        """
+        Internal method, do not use it anyhow
+
+        :return: bool
+        """
+        if self.dockerapi:
+            return self.dockerapi.isRunning(self.docker_id)
+        out = self.runHost(argv=["docker", "inspect", "--format", "{{.State.Running}}", self.docker_id],
+                           ignore_status=True, verbose=is_not_silent())
+        return out.exit_status == 0 and out.stdout.strip() == "true"
+
+    def getArch(self):
+        """
+        get architecture string of container, it is taken from image (inspect data), container is not started
+        for it, host architecture is used in case image does not declare it
+
+        :return: str
+        """
+        if self.guestarch is None:
+            if self.imagearch:
+                self.guestarch = DOCKERARCHS.get(self.imagearch, self.imagearch)
+            else:
+                self.guestarch = trans_dict["HOSTARCH"]
+        return self.guestarch
 
-    def run(self, command="ls /", **kwargs):
+    def run(self, command="ls /", argv=None, **kwargs):
         """
         Run command inside module, all params what allows avocado are passed inside shell,ignore_status, etc.
 
         :param command: str
+        :param argv: list of arguments, executed directly via docker exec without bash inside container
         :param kwargs: dict
         :return: avocado.process.run
         """
         self.start()
-        return self.runHost(
-            'docker exec %s bash -c "%s"' %
-            (self.docker_id, command.replace('"', r'\"')),
-            **kwargs)
+        try:
+            if self.info.get("session") or get_if_docker_session():
+                comout = self.__sessionRun(argv_to_command(argv) if argv is not None else format_command(command),
+                                           **kwargs)
+            elif self.dockerapi:
+                comout = self.__apiRun(list(argv) if argv is not None else ["bash", "-c", format_command(command)],
+                                       **kwargs)
+            elif argv is not None:
+                comout = self.runHost(argv=["docker", "exec", self.docker_id] + list(argv), **kwargs)
+            else:
+                comout = self.runHost(
+                    'docker exec %s bash -c "%s"' %
+                    (self.docker_id, command.replace('"', r'\"')),
+                    **kwargs)
+        except (process.CmdError, ModuleFrameworkException):
+            self.invalidateStatus()
+            raise
+        if comout.exit_status != 0:
+            self.invalidateStatus()
+        return comout
+
+    def __apiRun(self, argv, ignore_status=False, verbose=True, timeout=None, **kwargs):
+        """
+        Internal method, do not use it anyhow
+        Execute command via docker engine API, other avocado.process.run params are ignored
+
+        :return: avocado.process.CmdResult
+        """
+        result = self.dockerapi.execute(self.docker_id, argv, timeout=timeout)
+        comout = process.CmdResult(command=argv_to_command(argv), stdout=result.stdout, stderr=result.stderr,
+                                   exit_status=result.exit_status, duration=result.duration)
+        if result.exit_status is None:
+            raise process.CmdError(comout.command, comout, "Command timeout (%ss) via docker API" % timeout)
+        return self.__checkResult(comout, ignore_status, verbose)
+
+    def __sessionRun(self, command, ignore_status=False, verbose=True, timeout=None, **kwargs):
+        """
+        Internal method, do not use it anyhow
+        Execute command via long living shell session inside container (docker exec -i),
+        other avocado.process.run params are ignored
+
+        :return: avocado.process.CmdResult
+        """
+        from shellsession import ShellSession
+        if self.shellsession is None or self.docker_id not in self.shellsession.argv:
+            self.__closeSession()
+            self.shellsession = ShellSession(["docker", "exec", "-i", self.docker_id, "bash"])
+        return self.__checkResult(self.shellsession.run(command, timeout=timeout), ignore_status, verbose)
+
+    def __closeSession(self):
+        """
+        Internal method, do not use it anyhow
+
+        :return: None
+        """
+        if self.shellsession:
+            self.shellsession.close()
+            self.shellsession = None
+
+    def __checkResult(self, comout, ignore_status, verbose):
+        """
+        Internal method, do not use it anyhow
+        Log result and raise CmdError in same way as avocado.process.run does
+
+        :return: avocado.process.CmdResult
+        """
+        if verbose:
+            print_debug("command:", comout.command, "exit status:", comout.exit_status,
+                        "stdout:", comout.stdout, "stderr:", comout.stderr)
+        if comout.exit_status != 0 and not ignore_status:
+            raise process.CmdError(comout.command, comout)
+        return comout
 
     def copyTo(self, src, dest):
         """
@@ -434,6 +911,8 @@ class ContainerHelper(CommonFunctions):
         :return: None
         """
         self.start()
+        if self.dockerapi:
+            return self.dockerapi.copyTo(self.docker_id, src, dest)
         self.runHost("docker cp %s %s:%s" % (src, self.docker_id, dest), verbose=is_not_silent())
 
     def copyFrom(self, src, dest):
@@ -445,8 +924,80 @@ class ContainerHelper(CommonFunctions):
         :return: None
         """
         self.start()
+        if self.dockerapi:
+            return self.dockerapi.copyFrom(self.docker_id, src, dest)
         self.runHost("docker cp %s:%s %s" % (self.docker_id, src, dest), verbose=is_not_silent())
 
+    def copyToMany(self, pairs):
+        """
+        Copy many files or directory trees to container as one tar stream (docker cp - or API archive),
+        destination is exact path of copied item
+
+        :param pairs: list of tuples (path on host, path inside container)
+        :return: tarcopy.TransferStats
+        """
+        from tarcopy import write_archive
+        self.start()
+        start = time.time()
+        if self.dockerapi:
+            from StringIO import StringIO
+            archive = StringIO()
+            stats = write_archive(pairs, archive)
+            self.dockerapi.putArchive(self.docker_id, "/", archive.getvalue())
+        else:
+            import subprocess
+            copyprocess = subprocess.Popen(["docker", "cp", "-", "%s:/" % self.docker_id],
+                                           stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                stats = write_archive(pairs, copyprocess.stdin)
+            except IOError as e:
+                stats = e
+            copyprocess.stdin.close()
+            errors = copyprocess.stderr.read()
+            if copyprocess.wait() != 0 or isinstance(stats, IOError):
+                raise ContainerExc("Unable to copy files to container:", pairs, errors, stats)
+        stats.duration = time.time() - start
+        print_debug("Copied to container:", stats)
+        return stats
+
+    def copyFromMany(self, pairs):
+        """
+        Copy many files or directory trees from container as one tar stream (tar inside container),
+        destination is exact path of copied item
+
+        :param pairs: list of tuples (path inside container, path on host)
+        :return: tarcopy.TransferStats
+        """
+        from tarcopy import archive_name, extract_archive, UnsafeArchiveError
+        self.start()
+        start = time.time()
+        argv = ["tar", "-C", "/", "-cf", "-"] + [archive_name(src) for src, dest in pairs]
+        if self.dockerapi:
+            from StringIO import StringIO
+            result = self.dockerapi.execute(self.docker_id, argv)
+            if result.exit_status != 0:
+                raise ContainerExc("Unable to copy files from container:", pairs, result.stderr)
+            try:
+                stats = extract_archive(StringIO(result.stdout), pairs)
+            except UnsafeArchiveError as e:
+                raise ContainerExc("Unable to copy files from container:", pairs, e)
+        else:
+            import subprocess
+            copyprocess = subprocess.Popen(["docker", "exec", self.docker_id] + argv,
+                                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                stats = extract_archive(copyprocess.stdout, pairs)
+            except UnsafeArchiveError as e:
+                copyprocess.kill()
+                copyprocess.wait()
+                raise ContainerExc("Unable to copy files from container:", pairs, e)
+            errors = copyprocess.stderr.read()
+            if copyprocess.wait() != 0:
+                raise ContainerExc("Unable to copy files from container:", pairs, errors)
+        stats.duration = time.time() - start
+        print_debug("Copied from container:", stats)
+        return stats
+
     def __callSetupFromConfig(self):
         """
         Internal method, do not use it anyhow
@@ -473,6 +1024,7 @@ class RpmHelper(CommonFunctions):
 
     :avocado: disable
     """
+    concurrentrun = True
 
     def __init__(self):
         """
@@ -489,10 +1041,12 @@ class RpmHelper(CommonFunctions):
         self.bootstrappackages = []
 
     def setModuleDependencies(self):
+        import pdc_data
         temprepositories = {}
         if self.getModulemdYamlconfig()["data"].get("dependencies") and self.getModulemdYamlconfig()["data"][
             "dependencies"].get("requires"):
-            temprepositories = self.getModulemdYamlconfig()["data"]["dependencies"]["requires"]
+            # cached moduleMD is read only, dependencies are extended by dependencies from PDC
+            temprepositories = dict(self.getModulemdYamlconfig()["data"]["dependencies"]["requires"])
         temprepositories_cycle = dict(temprepositories)
         for x in temprepositories_cycle:
             pdc = pdc_data.PDCParser()
@@ -570,9 +1124,14 @@ class RpmHelper(CommonFunctions):
             self.whattoinstallrpm = " ".join(set(whattooinstall))
         else:
             if not self.whattoinstallrpm:
+                import pdc_data
                 self.bootstrappackages = pdc_data.getBasePackageSet(modulesDict=self.moduledeps,
                                                                     isModule=get_if_module(), isContainer=False)
-                self.whattoinstallrpm = " ".join(set(self.getPackageList() + self.bootstrappackages))
+                # cached index is shared by other callers, index with base packages is built aside
+                profileindex = self.getProfileIndex()
+                profileindex = ProfileIndex(profileindex.modulemd, self.config, get_correct_profile(),
+                                            self.bootstrappackages)
+                self.whattoinstallrpm = " ".join(profileindex.getInstallSet())
 
     def tearDown(self):
         """
@@ -623,7 +1182,7 @@ gpgcheck=0
                          "repositories are: ",
                          self.runHost("cat %s" % self.yumrepo, verbose=is_not_silent()).stdout)
 
-        self.ipaddr = trans_dict["GUESTIPADDR"]
+        self.ipaddrkey = "GUESTIPADDR"
 
     def status(self, command="/bin/true"):
         """
@@ -666,14 +1225,17 @@ gpgcheck=0
         else:
             self.runHost("%s" % command, shell=True, ignore_bg_processes=True, verbose=is_not_silent())
 
-    def run(self, command="ls /", **kwargs):
+    def run(self, command="ls /", argv=None, **kwargs):
         """
         Run command inside module, for RPM based it is same as runHost
 
         :param command: str of command to execute
+        :param argv: list of arguments, executed directly without bash
         :param kwargs: dict from avocado.process.run
         :return: avocado.process.run
         """
+        if argv is not None:
+            return self.runHost(argv=argv, **kwargs)
         return self.runHost('bash -c "%s"' %
                             command.replace('"', r'\"'), **kwargs)
 
@@ -724,6 +1286,8 @@ class NspawnHelper(RpmHelper):
 
     This class is derived from RPM HELPER, so that it uses same section in config file
     """
+    # systemd-nspawn supports --notify-ready, it is probed once per process
+    notifyready = None
 
     def __init__(self):
         """
@@ -733,6 +1297,7 @@ class NspawnHelper(RpmHelper):
         super(NspawnHelper, self).__init__()
         self.baseprefix = os.path.join(BASEPATHDIR, "chroot_")
         self.__selinuxState = None
+        self.guestarch = None
         time.time()
         actualtime = time.time()
         if get_if_do_cleanup():
@@ -740,6 +1305,15 @@ class NspawnHelper(RpmHelper):
         else:
             self.jmeno = self.moduleName
         self.chrootpath = os.path.abspath(self.baseprefix + self.jmeno)
+        # overlay root of ephemeral machine, key and lock of its template
+        self.overlay = None
+        self.templatekey = None
+        self.templatelock = None
+        # systemd-nspawn process of machine started by this helper
+        self.nspawnprocess = None
+        # argv prefix executing command inside machine, [] means machinectl shell, probed per started machine
+        self.execprefix = None
+        self.execlock = threading.Lock()
         print_info("name of CHROOT directory:", self.chrootpath)
         trans_dict["ROOT"] = self.chrootpath
 
@@ -766,41 +1340,82 @@ class NspawnHelper(RpmHelper):
         self.__callSetupFromConfig()
         self.__bootMachine()
 
+    def __getstate__(self):
+        # process, lock file and lock are not possible to pickle (moduleframework-cmd stores helper)
+        state = self.__dict__.copy()
+        state["nspawnprocess"] = None
+        state["templatelock"] = None
+        state["execlock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.execlock = threading.Lock()
+        if self.overlay and self.templatekey:
+            # template is lower layer of mounted overlay, it has to be held by every process using machine
+            from rootfscache import RootfsTemplates
+            self.templatelock = RootfsTemplates().share(self.templatekey)
+            if self.templatelock is None:
+                print_info("Rootfs template of overlay does not exist anymore:", self.templatekey)
+
     def __is_killed(self):
-        for foo in range(DEFAULTRETRYTIMEOUT):
-            time.sleep(foo)
+
+        def stopped():
+            # own systemd-nspawn process is checked without asking machined
+            if self.nspawnprocess and self.nspawnprocess.poll() is None:
+                return False
             out = self.runHost("machinectl status %s" % self.jmeno, verbose=is_debug(), ignore_status=True)
-            if out.exit_status != 0:
-                print_debug("NSPAWN machine %s stopped" % self.jmeno)
-                return True
+            return out.exit_status != 0
+
+        if wait_for(stopped, DEFAULTRETRYTIMEOUT):
+            print_debug("NSPAWN machine %s stopped" % self.jmeno)
+            self.nspawnprocess = None
+            return True
         raise NspawnExc("Unable to stop machine %s within %d" % (self.jmeno, DEFAULTRETRYTIMEOUT))
 
-    def __is_booted(self):
-        for foo in range(DEFAULTRETRYTIMEOUT):
-            time.sleep(foo)
-            out = self.runHost("machinectl status %s" % self.jmeno, verbose=is_debug(), ignore_status=True)
-            if "logind.service" in out.stdout:
-                time.sleep(2)
-                print_debug("NSPAWN machine %s booted" % self.jmeno)
-                return True
+    def __is_booted(self, notify=None):
+        start = time.time()
+        if notify:
+            booted = notify.wait("READY", timeout=DEFAULTRETRYTIMEOUT,
+                                 alive=lambda: self.nspawnprocess.poll() is None)
+        else:
+            booted = wait_for(lambda: self.runHost("systemctl --machine=%s is-system-running" % self.jmeno,
+                                                   verbose=is_debug(), ignore_status=True
+                                                   ).stdout.strip() in ("running", "degraded"),
+                              DEFAULTRETRYTIMEOUT, interval=0.2)
+        if booted:
+            print_debug("NSPAWN machine %s booted in %.2fs" % (self.jmeno, time.time() - start))
+            return True
         raise NspawnExc("Unable to start machine %s within %d" % (self.jmeno, DEFAULTRETRYTIMEOUT))
 
+    def __notifySupported(self):
+        """
+        Internal method, do not use it anyhow
+
+        :return: bool systemd-nspawn supports --notify-ready option
+        """
+        if NspawnHelper.notifyready is None:
+            out = self.runHost("systemd-nspawn --help", verbose=is_debug(), ignore_status=True)
+            NspawnHelper.notifyready = "--notify-ready" in out.stdout
+        return NspawnHelper.notifyready
+
     def __do_smart_start_cleanup(self):
         """
         Internal method, do not use it anyhow
 
         :return: None
         """
-
+        import glob
+        from rootfscache import remove_tree
         if get_if_do_cleanup():
             # delete directory with same same (in case used option DO NOT CLEANUP)
             if os.path.exists(self.chrootpath):
-                shutil.rmtree(self.chrootpath, ignore_errors=True)
+                remove_tree(self.chrootpath)
             # DELETE every chroot dir in case any exists
             dirstodelete = glob.glob(self.baseprefix + "*")
             if dirstodelete:
                 for dtd in dirstodelete:
-                    shutil.rmtree(dtd, ignore_errors=True)
+                    remove_tree(dtd)
             # Terminate machine in case of same name and still running
         try:
             self.runHost("machinectl terminate %s" % self.jmeno, verbose=is_debug(), ignore_status=True)
@@ -818,90 +1433,139 @@ class NspawnHelper(RpmHelper):
         self.__do_smart_start_cleanup()
         if not os.path.exists(os.path.join(self.chrootpath, "usr")):
             self.runHost("{HOSTPACKAGER} install systemd-container", verbose=is_not_silent())
-            repos_to_use = ""
-            counter = 0
-            for repo in self.repos:
-                counter = counter + 1
-                repos_to_use += " --repofrompath %s%d,%s" % (
-                    self.moduleName, counter, repo)
-            try:
-                @Retry(attempts=DEFAULTRETRYCOUNT, timeout=DEFAULTRETRYTIMEOUT * 60, delay=2 * 60,
-                       error=NspawnExc("RETRY: Unable to install packages"))
-                def tmpfunc():
-                    self.runHost(
-                        "%s install --nogpgcheck --setopt=install_weak_deps=False --installroot %s --allowerasing --disablerepo=* --enablerepo=%s* %s %s" %
-                        (trans_dict["HOSTPACKAGER"], self.chrootpath, self.moduleName, repos_to_use,
-                         self.whattoinstallrpm), verbose=is_not_silent())
-
-                tmpfunc()
-            except Exception as e:
-                raise NspawnExc(
-                    "ERROR: Unable to install packages %s\n original exeption:\n%s\n" %
-                    (self.whattoinstallrpm, str(e)))
-            # COPY yum repository inside NSPAW, to be able to do installations
-            insiderepopath = os.path.join(self.chrootpath, self.yumrepo[1:])
-            try:
-                os.makedirs(os.path.dirname(insiderepopath))
-            except:
-                pass
-            counter = 0
-            f = open(insiderepopath, 'w')
-            for repo in self.repos:
-                counter = counter + 1
-                add = """[%s%d]
+            if get_if_rootfs_cache() or get_if_nspawn_ephemeral():
+                from rootfscache import RootfsTemplates, OverlayRoot
+                templates = RootfsTemplates()
+                packages = self.whattoinstallrpm.split()
+                key = templates.templateKey(packages, self.repos, self.moduleName)
+                info = {"name": self.moduleName, "packages": packages, "repos": self.repos}
+                if get_if_nspawn_ephemeral():
+                    self.templatelock = templates.hold(key, self.__installRootfs, info=info)[1]
+                    self.templatekey = key
+                    self.overlay = OverlayRoot(templates.path(key), self.chrootpath)
+                    self.overlay.mount()
+                else:
+                    templates.checkout(key, self.chrootpath, self.__installRootfs, info=info)
+                templates.prune(keep=[key])
+            else:
+                self.__installRootfs(self.chrootpath)
+
+    def __installRootfs(self, root):
+        """
+        Internal method, do not use it anyhow
+
+        :param root: directory where to install packages
+        :return: None
+        """
+        import shutil
+        import glob
+        repos_to_use = ""
+        counter = 0
+        for repo in self.repos:
+            counter = counter + 1
+            repos_to_use += " --repofrompath %s%d,%s" % (
+                self.moduleName, counter, repo)
+        try:
+            @Retry(attempts=DEFAULTRETRYCOUNT, timeout=DEFAULTRETRYTIMEOUT * 60, delay=2 * 60,
+                   error=NspawnExc("RETRY: Unable to install packages"))
+            def tmpfunc():
+                self.runHost(
+                    "%s install --nogpgcheck --setopt=install_weak_deps=False --installroot %s --allowerasing --disablerepo=* --enablerepo=%s* %s %s" %
+                    (trans_dict["HOSTPACKAGER"], root, self.moduleName, repos_to_use,
+                     self.whattoinstallrpm), verbose=is_not_silent())
+
+            tmpfunc()
+        except Exception as e:
+            raise NspawnExc(
+                "ERROR: Unable to install packages %s\n original exeption:\n%s\n" %
+                (self.whattoinstallrpm, str(e)))
+        # COPY yum repository inside NSPAW, to be able to do installations
+        insiderepopath = os.path.join(root, self.yumrepo[1:])
+        try:
+            os.makedirs(os.path.dirname(insiderepopath))
+        except:
+            pass
+        counter = 0
+        f = open(insiderepopath, 'w')
+        for repo in self.repos:
+            counter = counter + 1
+            add = """[%s%d]
 name=%s%d
 baseurl=%s
 enabled=1
 gpgcheck=0
 
 """ % (self.moduleName, counter, self.moduleName, counter, repo)
-                f.write(add)
-            f.close()
-
-            #        shutil.copy(self.yumrepo, insiderepopath)
-            #        self.runHost("sed s/enabled=0/enabled=1/ -i %s" % insiderepopath, ignore_status=True)
-            for repo in self.repos:
-                if "file:///" in repo:
-                    src = repo[7:]
-                    srcto = os.path.join(self.chrootpath, src[1:])
-                    try:
-                        os.makedirs(os.path.dirname(srcto))
-                    except Exception as e:
-                        print_debug(e, "Unable to create DIR (already created)", srcto)
-                        pass
-                    try:
-                        shutil.copytree(src, srcto)
-                    except Exception as e:
-                        print_debug(e, "Unable to copy files from:", src, "to:", srcto)
-                        pass
-            pkipath = "/etc/pki/rpm-gpg"
-            pkipath_ch = os.path.join(self.chrootpath, pkipath[1:])
-            try:
-                os.makedirs(pkipath_ch)
-            except BaseException:
-                pass
-            for filename in glob.glob(os.path.join(pkipath, '*')):
-                shutil.copy(filename, pkipath_ch)
-            print_info("repo prepared for microdnf:", insiderepopath, open(insiderepopath, 'r').read())
+            f.write(add)
+        f.close()
+
+        #        shutil.copy(self.yumrepo, insiderepopath)
+        #        self.runHost("sed s/enabled=0/enabled=1/ -i %s" % insiderepopath, ignore_status=True)
+        for repo in self.repos:
+            if "file:///" in repo:
+                src = repo[7:]
+                srcto = os.path.join(root, src[1:])
+                try:
+                    os.makedirs(os.path.dirname(srcto))
+                except Exception as e:
+                    print_debug(e, "Unable to create DIR (already created)", srcto)
+                    pass
+                try:
+                    shutil.copytree(src, srcto)
+                except Exception as e:
+                    print_debug(e, "Unable to copy files from:", src, "to:", srcto)
+                    pass
+        pkipath = "/etc/pki/rpm-gpg"
+        pkipath_ch = os.path.join(root, pkipath[1:])
+        try:
+            os.makedirs(pkipath_ch)
+        except BaseException:
+            pass
+        for filename in glob.glob(os.path.join(pkipath, '*')):
+            shutil.copy(filename, pkipath_ch)
+        print_info("repo prepared for microdnf:", insiderepopath, open(insiderepopath, 'r').read())
 
     def __bootMachine(self):
+        from sdnotify import NotifySocket
 
         @Retry(attempts=DEFAULTRETRYCOUNT, timeout=DEFAULTRETRYTIMEOUT, delay=21,
                error=NspawnExc("RETRY: Unable to start nspawn machine"))
         def tempfnc():
-            print_debug("starting container via command:",
-                        "systemd-nspawn --machine=%s -bD %s" % (self.jmeno, self.chrootpath))
-            nspawncont = process.SubProcess(
-                "systemd-nspawn --machine=%s -bD %s" %
-                (self.jmeno, self.chrootpath), verbose=is_debug())
+            # readiness is notified by init of machine, otherwise state of machine is polled
+            notify = NotifySocket() if self.__notifySupported() else None
+            command = "systemd-nspawn %s--machine=%s -bD %s" % (
+                "--notify-ready=yes " if notify else "", self.jmeno, self.chrootpath)
+            print_debug("starting container via command:", command)
+            nspawncont = process.SubProcess(command, verbose=is_debug(), env=notify.env() if notify else None)
             nspawncont.start()
-            self.__is_booted()
+            self.nspawnprocess = nspawncont
+            try:
+                self.__is_booted(notify)
+            finally:
+                if notify:
+                    notify.close()
 
         tempfnc()
         print_info("machine: %s started" % self.jmeno)
+        self.execprefix = None
+        self.attachTelemetry()
+        # architecture is probed once per started machine, when it is used first time
+        self.guestarch = None
+        trans_dict["GUESTARCH"] = LazyValue(self.getArch)
 
-        trans_dict["GUESTIPADDR"] = trans_dict["HOSTIPADDR"]
-        self.ipaddr = trans_dict["GUESTIPADDR"]
+        trans_dict["GUESTIPADDR"] = LazyValue(lambda: trans_dict["HOSTIPADDR"])
+        self.ipaddrkey = "GUESTIPADDR"
+
+    def getMainPid(self):
+        """
+        Return pid (on host) of init process of machine
+
+        :return: int
+        """
+        out = self.runHost(argv=["machinectl", "show", "-p", "Leader", self.jmeno], ignore_status=True,
+                           verbose=False)
+        leader = out.stdout.strip().split("=", 1)[-1]
+        return int(leader) if out.exit_status == 0 and leader.isdigit() else None
 
     def status(self, command="/bin/true"):
         """
@@ -945,49 +1609,153 @@ gpgcheck=0
         else:
             self.run("%s" % command, shell=True, ignore_bg_processes=True)
 
-    def run(self, command="ls /", **kwargs):
+    def __enginePrefix(self, engine):
+        """
+        Internal method, do not use it anyhow
+
+        :param engine: str systemd-run or nsenter
+        :return: list argv prefix, None in case engine is not usable
+        """
+        if engine == "systemd-run":
+            return ["systemd-run", "--machine=%s" % self.jmeno, "--pipe", "--wait", "--quiet"]
+        if engine == "nsenter":
+            leader = self.getMainPid()
+            if leader:
+                return ["nsenter", "--target", str(leader), "--mount", "--uts", "--ipc", "--net", "--pid",
+                        "--root", "--wd", "--", "env", "-i", "HOME=/root",
+                        "PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"]
+        return None
+
+    def __execPrefix(self):
         """
-        Run command inside nspawn module type. It uses machinectl shell command.
+        Internal method, do not use it anyhow
+        Select how to execute commands inside machine (exec in nspawn section of config, or MTF_NSPAWN_EXEC):
+        systemd-run or nsenter, by default first one what works. Engine has to pass output and exit status
+        of probe command, otherwise machinectl shell is used (fallback).
+
+        :return: list argv prefix, None for machinectl shell
+        """
+        with self.execlock:
+            if self.execprefix is None:
+                self.execprefix = self.__probeExecPrefix()
+        return self.execprefix or None
+
+    def __probeExecPrefix(self):
+        """
+        Internal method, do not use it anyhow
+
+        :return: list argv prefix, [] for machinectl shell
+        """
+        engine = os.environ.get("MTF_NSPAWN_EXEC") or self.info.get("exec")
+        execprefix = []
+        for candidate in [engine] if engine else ["systemd-run", "nsenter"]:
+            try:
+                prefix = self.__enginePrefix(candidate)
+                if prefix:
+                    out = self.runHost(argv=prefix + ["/bin/sh", "-c", "echo mtf; exit 3"], ignore_status=True,
+                                       verbose=is_debug())
+                    if out.exit_status == 3 and out.stdout.strip() == "mtf":
+                        execprefix = prefix
+                        break
+            except OSError as e:
+                print_debug("Unable to execute commands inside machine via:", candidate, e)
+        print_debug("commands inside machine %s are executed via:" % self.jmeno,
+                    execprefix[0] if execprefix else "machinectl")
+        return execprefix
+
+    def run(self, command="ls /", argv=None, **kwargs):
+        """
+        Run command inside nspawn module type. It uses systemd-run or nsenter, output is passed directly
+        and exit status is exit status of command.
+        In case none of them works, machinectl shell command is used,
          It need few workarounds, that's why it the code seems so strange
 
         TODO: workaround because machinedctl is unable to behave like ssh. It is bug
         systemd-run should be used, but in F-25 it does not contain --wait option
 
         :param command: str command to be executed
+        :param argv: list of arguments, it is not formatted via trans_dict and not interpreted by shell
         :param kwargs: dict parameters passed to avocado.process.run
         :return: avocado.process.run
         """
-        lpath = "/var/tmp"
-        comout = self.runHost(
-            """machinectl shell root@{machine} /bin/bash -c "({comm})>{pin}/stdout 2>{pin}/stderr; echo $?>{pin}/retcode; sleep 1" """.format(
-                machine=self.jmeno,
-                comm=command.replace(
-                    '"',
-                    r'\"'),
-                pin=lpath),
-            **kwargs)   
-        try:
-            if not kwargs:
-                kwargs = {}
-            kwargs["verbose"] = is_not_silent()
-            should_ignore = kwargs.get("ignore_status")
+        should_ignore = kwargs.get("ignore_status")
+        prefix = self.__execPrefix()
+        if prefix:
             kwargs["ignore_status"] = True
-            b = self.runHost(
-                'bash -c "cat {chroot}{pin}/stdout; cat {chroot}{pin}/stderr > /dev/stderr; exit `cat {chroot}{pin}/retcode`"'.format(
-                    chroot=self.chrootpath,
-                    pin=lpath),
-                **kwargs)
+            if argv is not None:
+                command = argv_to_command(argv)
+                comout = self.runHost(argv=prefix + list(argv), **kwargs)
+            else:
+                command = format_command(command)
+                comout = self.runHost(argv=prefix + ["/bin/bash", "-c", command], **kwargs)
+            comout.command = command
+            if comout.exit_status == 0 or should_ignore:
+                return comout
+            raise process.CmdError(comout.command, comout)
+        import uuid
+        import shutil
+        # every call has own result directory, so that concurrent calls do not overwrite results
+        lpath = "/var/tmp/mtf-run-%s" % uuid.uuid4().hex
+        # results are read directly from chroot directory, no need to run another shell on host
+        resultdir = os.path.join(self.chrootpath, lpath[1:])
+        try:
+            if argv is not None:
+                command = argv_to_command(argv)
+                comout = self.runHost(
+                    argv=["machinectl", "shell", "root@%s" % self.jmeno, "/bin/bash", "-c",
+                          "mkdir -p {pin}; ({comm})>{pin}/stdout 2>{pin}/stderr; echo $?>{pin}/retcode; sleep 1".format(
+                              comm=command, pin=lpath)],
+                    **kwargs)
+            else:
+                comout = self.runHost(
+                    """machinectl shell root@{machine} /bin/bash -c "mkdir -p {pin}; ({comm})>{pin}/stdout 2>{pin}/stderr; echo $?>{pin}/retcode; sleep 1" """.format(
+                        machine=self.jmeno,
+                        comm=command.replace(
+                            '"',
+                            r'\"'),
+                        pin=lpath),
+                    **kwargs)
+            comout.stdout = self.__readResult(resultdir, "stdout")
+            comout.stderr = self.__readResult(resultdir, "stderr")
+            try:
+                comout.exit_status = int(self.__readResult(resultdir, "retcode"))
+            except ValueError:
+                print_debug("Unable to read return code of command inside machine, using machinectl one")
         finally:
-            comout.stdout = b.stdout
-            comout.stderr = b.stderr
-            comout.exit_status = b.exit_status
+            # result directory is removed also in case machinectl fails (e.g. by timeout)
+            shutil.rmtree(resultdir, ignore_errors=True)
+        if argv is not None:
+            comout.command = command
+        else:
             removesworkaround = re.search('[^(]*\((.*)\)[^)]*', comout.command)
             if removesworkaround:
                 comout.command = removesworkaround.group(1)
-            if comout.exit_status == 0 or should_ignore:
-                return comout
-            else:
-                raise process.CmdError(comout.command, comout)
+        if comout.exit_status == 0 or should_ignore:
+            return comout
+        else:
+            raise process.CmdError(comout.command, comout)
+
+    def __readResult(self, resultdir, name):
+        """
+        Internal method, do not use it anyhow
+
+        :return: str
+        """
+        try:
+            with open(os.path.join(resultdir, name)) as resultfile:
+                return resultfile.read()
+        except IOError:
+            return ""
+
+    def getArch(self):
+        """
+        get architecture string of nspawn machine, it is probed just once per started machine
+
+        :return: str
+        """
+        if self.guestarch is None:
+            self.guestarch = self.run("uname -m", verbose=False).stdout.strip()
+        return self.guestarch
 
     def selfcheck(self):
         """
@@ -1056,8 +1824,14 @@ gpgcheck=0
                 "setenforce %s" %
                 self.__selinuxState,
                 ignore_status=True, verbose=is_not_silent())
-        if get_if_do_cleanup() and os.path.exists(self.chrootpath):
-            shutil.rmtree(self.chrootpath, ignore_errors=True)
+        if get_if_do_cleanup() and self.overlay:
+            self.overlay.umount()
+            if self.templatelock:
+                self.templatelock.close()
+            self.overlay = self.templatekey = self.templatelock = None
+        elif get_if_do_cleanup() and os.path.exists(self.chrootpath):
+            from rootfscache import remove_tree
+            remove_tree(self.chrootpath)
         self.__callCleanupFromConfig()
 
     def __callSetupFromConfig(self):
@@ -1118,6 +1892,10 @@ class AvocadoTest(Test):
 
         :return: None
         """
+        if get_if_telemetry():
+            from telemetry import ResourceMonitor
+            self.backend.telemetry = ResourceMonitor()
+            self.backend.telemetry.begin()
         return self.backend.setUp()
 
     def tearDown(self, *args, **kwargs):
@@ -1129,8 +1907,30 @@ class AvocadoTest(Test):
 
         :return: None
         """
+        if self.backend.telemetry:
+            self.__reportTelemetry()
         return self.backend.tearDown(*args, **kwargs)
 
+    def __reportTelemetry(self):
+        """
+        Internal method, do not use it anyhow
+        Write summary of resource usage to test log and telemetry.json to test output directory
+
+        :return: None
+        """
+        import json
+        from telemetry import format_summary
+        summary = self.backend.telemetry.end()
+        self.backend.telemetry = None
+        self.log.info("Resource usage of %s module: %s" % (self.moduleType, format_summary(summary)))
+        summary.update({"test": str(self.name), "module_type": self.moduleType})
+        outputdir = getattr(self, "outputdir", None) or self.logdir
+        try:
+            with open(os.path.join(outputdir, "telemetry.json"), "w") as artifact:
+                json.dump(summary, artifact, indent=2, sort_keys=True)
+        except (IOError, OSError) as e:
+            print_info("Unable to store resource usage:", e)
+
     def start(self, *args, **kwargs):
         """
         Start the module, it uses start action from config file for selected module or it calls default start
@@ -1224,6 +2024,14 @@ class AvocadoTest(Test):
         """
         return self.backend.getModulemdYamlconfig(*args, **kwargs)
 
+    def getProfileIndex(self):
+        """
+        Return index of packages of all profiles from moduleMD file, see ProfileIndex
+
+        :return: ProfileIndex
+        """
+        return self.backend.getProfileIndex(withmodulemd=True)
+
     def getActualProfile(self):
         """
         Return actual profile set profile via env variable PROFILE, could be used for filtering tests with skipIf method
@@ -1255,6 +2063,35 @@ class AvocadoTest(Test):
         """
         return self.backend.copyFrom(*args, **kwargs)
 
+    def copyToMany(self, *args, **kwargs):
+        """
+        Copy many files or directory trees from host machine to module in one transfer (if module type allows it)
+
+        :param pairs: list of tuples (path on host, path inside module)
+        :return: tarcopy.TransferStats
+        """
+        return self.backend.copyToMany(*args, **kwargs)
+
+    def copyFromMany(self, *args, **kwargs):
+        """
+        Copy many files or directory trees from module to host machine in one transfer (if module type allows it)
+
+        :param pairs: list of tuples (path inside module, path on host)
+        :return: tarcopy.TransferStats
+        """
+        return self.backend.copyFromMany(*args, **kwargs)
+
+    def runParallel(self, *args, **kwargs):
+        """
+        Run independent commands inside module concurrently (if module type allows it)
+
+        :param commands: list of str commands
+        :param maxworkers: maximal number of running commands
+        :param kwargs: dict parameters passed to run
+        :return: list of avocado.process.CmdResult in same order as commands
+        """
+        return self.backend.runParallel(*args, **kwargs)
+
     def getIPaddr(self, *args, **kwargs):
         """
         Return ip addr string of guest machine
@@ -1347,11 +2184,9 @@ def get_correct_backend():
     :return: tuple (specific module object, str)
     """
     amodule = os.environ.get('MODULE')
-    readconfig = CommonFunctions()
-    readconfig.loadconfig()
-    if "default_module" in readconfig.config and readconfig.config[
-        "default_module"] is not None and amodule is None:
-        amodule = readconfig.config["default_module"]
+    config = get_config()
+    if config.get("default_module") is not None and amodule is None:
+        amodule = config["default_module"]
     if amodule == 'docker':
         return ContainerHelper(), amodule
     elif amodule == 'rpm':
@@ -1387,25 +2222,6 @@ def get_correct_url():
     return amodule
 
 
-def get_config():
-    """
-    Read the module's configuration file
-
-    :default: ``./config.yaml`` in the ``tests`` directory of the module's root directory
-    :envvar: **CONFIG=path/to/file** overrides default value.
-    :return: str
-    """
-    cfgfile = os.environ.get('CONFIG') or './config.yaml'
-    try:
-       with open(cfgfile, 'r') as ymlfile:
-           xcfg = yaml.load(ymlfile.read())
-           return xcfg
-    except IOError:
-       raise ConfigExc(
-           "Error: File '%s' doesn't appear to exist or it's not a YAML file." %
-            cfgfile + " " +
-           "Tip: If the CONFIG envvar is not set, mtf-generator looks for './config'.")
-
 def get_compose_url():
     """
     Return Compose Url if set in config or via
@@ -1414,15 +2230,14 @@ def get_compose_url():
     :return: str
     """
     compose = os.environ.get('COMPOSEURL')
-    readconfig = CommonFunctions()
-    readconfig.loadconfig()
     if compose is None:
-        if readconfig.config.get("compose-url"):
-            compose = readconfig.config.get("compose-url")
-        elif readconfig.config['module']['rpm'].get("repo"):
-            compose = readconfig.config['module']['rpm'].get("repo")
+        config = get_config()
+        if config.get("compose-url"):
+            compose = config.get("compose-url")
+        elif config['module']['rpm'].get("repo"):
+            compose = config['module']['rpm'].get("repo")
         else:
-            compose = readconfig.config['module']['rpm'].get("repos")[0]
+            compose = config['module']['rpm'].get("repos")[0]
     return compose
 
 
@@ -1435,16 +2250,16 @@ def get_correct_modulemd():
     :return: dict
     """
     mdf = os.environ.get('MODULEMDURL')
-    readconfig = CommonFunctions()
-    readconfig.loadconfig()
     try:
         if mdf:
             return mdf
-        elif readconfig.config.get("modulemd-url"):
-            return readconfig.config.get("modulemd-url")
+        config = get_config()
+        if config.get("modulemd-url"):
+            return config.get("modulemd-url")
         else:
+            from compose_info import ComposeParser
             a = ComposeParser(get_compose_url())
-            b = a.variableListForModule(readconfig.config.get("name"))
+            b = a.variableListForModule(config.get("name"))
             return [x[12:] for x in b if 'MODULEMDURL=' in x][0]
     except AttributeError:
         return None
@@ -1464,6 +2279,7 @@ def get_latest_repo_url(wmodule="base-runtime", wstream="master", fake=False):
     if fake:
         return "http://mirror.vutbr.cz/fedora/releases/25/Everything/x86_64/os/"
     else:
+        import pdc_data
         tmp_pdc = pdc_data.PDCParser()
         tmp_pdc.setLatestPDC(wmodule, wstream)
         return tmp_pdc.generateRepoUrl()
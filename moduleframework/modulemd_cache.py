@@ -0,0 +1,187 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Persistent cache of moduleMD files shared between test processes.
+
+Layout of cache directory:
+  urls/<sha1 of url>.json    url, ETag, Last-Modified, time of fetch and digest of content
+  objects/<sha256>.yaml      raw downloaded document
+Only plain data are stored (no pickles), documents are parsed by safe YAML loader once per process.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import urllib2
+import yaml
+import yamlhelper
+from common import *
+
+MODULEMDCACHEDIR = os.path.join(CACHEDIR, "modulemd")
+
+
+class ModulemdCache(object):
+    """
+    Class for downloading and parsing moduleMD files, every document is downloaded and parsed just once,
+    later it is revalidated via ETag/If-Modified-Since after TTL expires.
+    In offline mode (MTF_OFFLINE) cached data are used without network access.
+    """
+
+    def __init__(self, cachedir=MODULEMDCACHEDIR):
+        self.cachedir = cachedir
+        # parsed objects of this process, key is digest of raw document
+        self.parsed = {}
+        # raw documents what were not possible to store to cache directory
+        self.raw = {}
+
+    def __path(self, *parts):
+        return os.path.join(self.cachedir, *parts)
+
+    def __indexpath(self, url):
+        return self.__path("urls", "%s.json" % hashlib.sha1(url).hexdigest())
+
+    def __objectpath(self, digest, suffix):
+        return self.__path("objects", "%s.%s" % (digest, suffix))
+
+    def __write(self, path, data):
+        """
+        Internal method, write file atomically, it is safe when more processes use cache
+
+        :return: None
+        """
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            tmpfd, tmppath = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(tmpfd, "wb") as tmpfile:
+                tmpfile.write(data)
+            os.rename(tmppath, path)
+        except (IOError, OSError) as e:
+            print_debug("Unable to store file to modulemd cache:", path, e)
+
+    def __readindex(self, url):
+        try:
+            with open(self.__indexpath(url)) as indexfile:
+                index = json.load(indexfile)
+            if os.path.exists(self.__objectpath(index["digest"], "yaml")):
+                return index
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def __store(self, url, raw, headers=None):
+        """
+        Internal method, store raw document and index of url
+
+        :return: str digest of document
+        """
+        digest = hashlib.sha256(raw).hexdigest()
+        if not os.path.exists(self.__objectpath(digest, "yaml")):
+            self.__write(self.__objectpath(digest, "yaml"), raw)
+            if not os.path.exists(self.__objectpath(digest, "yaml")):
+                self.raw[digest] = raw
+        if headers is not None:
+            index = {"url": url,
+                     "digest": digest,
+                     "fetched": time.time(),
+                     "etag": headers.get("ETag"),
+                     "last_modified": headers.get("Last-Modified")}
+            self.__write(self.__indexpath(url), json.dumps(index))
+        return digest
+
+    def fetch(self, url):
+        """
+        Return digest of actual document for url, download it only when necessary.
+        Local files (file://) are always read.
+
+        :param url: str
+        :return: str
+        """
+        if "://" not in url:
+            url = "file://%s" % os.path.abspath(url)
+        try:
+            if url.startswith("file://"):
+                return self.__store(url, urllib2.urlopen(url).read())
+            index = self.__readindex(url)
+            if index and (get_if_offline() or time.time() - index["fetched"] < get_modulemd_cache_ttl()):
+                return index["digest"]
+            if get_if_offline():
+                raise ConfigExc("moduleMD file %s is not cached and offline mode (MTF_OFFLINE) is set" % url)
+            request = urllib2.Request(url)
+            if index and index.get("etag"):
+                request.add_header("If-None-Match", index["etag"])
+            if index and index.get("last_modified"):
+                request.add_header("If-Modified-Since", index["last_modified"])
+            try:
+                response = urllib2.urlopen(request)
+            except urllib2.HTTPError as e:
+                if e.code == 304 and index:
+                    print_debug("moduleMD file not modified, using cache:", url)
+                    index["fetched"] = time.time()
+                    self.__write(self.__indexpath(url), json.dumps(index))
+                    return index["digest"]
+                raise
+            except urllib2.URLError as e:
+                if index:
+                    print_info("Unable to revalidate moduleMD file, using cached one:", url, e)
+                    return index["digest"]
+                raise
+            return self.__store(url, response.read(), response.info())
+        except (IOError, ValueError) as e:
+            raise ConfigExc("Cannot load file", url, e)
+
+    def get(self, url):
+        """
+        Return parsed moduleMD document, it is read only object shared inside process
+
+        :param url: str
+        :return: FrozenDict
+        """
+        digest = self.fetch(url)
+        if digest not in self.parsed:
+            try:
+                if digest in self.raw:
+                    raw = self.raw.pop(digest)
+                else:
+                    with open(self.__objectpath(digest, "yaml")) as ymlfile:
+                        raw = ymlfile.read()
+                self.parsed[digest] = freeze(yamlhelper.load(raw))
+            except (IOError, OSError, ValueError, yaml.YAMLError) as e:
+                raise ConfigExc("Cannot load file", url, e)
+        return self.parsed[digest]
+
+
+_modulemd_cache = ModulemdCache()
+
+
+def get_modulemd(url):
+    """
+    Return parsed moduleMD file from url via process wide cache
+
+    :param url: str
+    :return: FrozenDict
+    """
+    return _modulemd_cache.get(url)
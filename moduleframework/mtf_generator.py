@@ -23,13 +23,13 @@
 
 from __future__ import print_function
 
-from moduleframework.module_framework import CommonFunctions
+from moduleframework.common import get_config
 
 
-class TestGenerator(CommonFunctions):
+class TestGenerator(object):
 
     def __init__(self):
-        self.loadconfig()
+        self.config = get_config()
         self.output = ""
         self.templateClassBefore()
         if 'test' in self.config:
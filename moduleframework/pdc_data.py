@@ -28,8 +28,8 @@ Download and create local repos
 Construct parameters for automatization (CIs)
 """
 
-import yaml
 import re
+import yamlhelper
 from avocado import utils
 from common import *
 from pdc_client import PDCClient
@@ -102,7 +102,7 @@ class PDCParser():
         if not mod_info or "results" not in mod_info.keys() or not mod_info["results"]:
             raise PDCExc("QUERY: %s is not available on PDC" % pdc_query)
         self.pdcdata = mod_info["results"][-1]
-        self.modulemd = yaml.load(self.pdcdata["modulemd"])
+        self.modulemd = yamlhelper.load(self.pdcdata["modulemd"])
 
     def setFullVersion(self, nvr):
         """
@@ -124,7 +124,7 @@ class PDCParser():
         :param yamlinp: yaml input string
         :return:
         """
-        raw = yaml.load(yamlinp)
+        raw = yamlhelper.load(yamlinp)
         self.name = raw["msg"]["name"]
         self.stream = raw["msg"]["stream"]
         self.version = raw["msg"]["version"]
@@ -177,9 +177,8 @@ class PDCParser():
         :return: str url of file
         """
         omodulefile = MODULEFILE
-        mdfile = open(omodulefile, mode="w")
-        mdfile.write(yaml.dump(self.getmoduleMD()))
-        mdfile.close()
+        with open(omodulefile, mode="w") as mdfile:
+            yamlhelper.dump(self.getmoduleMD(), mdfile)
         return "file://%s" % os.path.abspath(omodulefile)
 
     def generateParams(self):
@@ -218,14 +217,16 @@ class PDCParser():
         :return: None
         """
         print_info("DOWNLOADING ALL packages for %s_%s_%s" % (self.name, self.stream, self.version))
+        # error is same for every package, it is raised just in case all attempts fail
+        retryerror = KojiExc(
+            "RETRY: Unbale to fetch package from koji after %d attempts" % (DEFAULTRETRYCOUNT * 10))
         for foo in utils.process.run("koji list-tagged --quiet %s" % self.pdcdata["koji_tag"], verbose=is_debug()).stdout.split("\n"):
             pkgbouid = foo.strip().split(" ")[0]
             if len(pkgbouid) > 4:
                 print_debug("DOWNLOADING: %s" % foo)
 
                 @Retry(attempts=DEFAULTRETRYCOUNT * 10, timeout=DEFAULTRETRYTIMEOUT * 60, delay=DEFAULTRETRYTIMEOUT,
-                       error=KojiExc(
-                           "RETRY: Unbale to fetch package from koji after %d attempts" % (DEFAULTRETRYCOUNT * 10)))
+                       error=retryerror)
                 def tmpfunc():
                     a = utils.process.run(
                         "cd %s; koji download-build %s  -a %s -a noarch" %
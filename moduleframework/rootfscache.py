@@ -0,0 +1,354 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+
+"""
+Cache of installed root filesystems (templates) of nspawn machines.
+Packages are installed to template once, every test gets its clone. Template is cloned by the cheapest
+way the filesystem supports:
+  snapshot   btrfs snapshot (template is btrfs subvolume)
+  reflink    copy with shared data blocks (btrfs, xfs)
+  copy       plain copy
+
+Layout of cache directory:
+  rootfs/<key>/         template
+  rootfs/<key>.json     packages, repositories, size and way of creation of template,
+                        modification time is time of last use
+  rootfs/<key>.lock     lock file (exclusive for build and removal, shared for clone and overlay)
+
+Template could be also used directly as read only lower layer of overlay filesystem (ephemeral machine),
+changes of machine are stored in upper layer next to root directory, <root>.overlay/upper.
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+from contextlib import contextmanager
+from avocado.utils import process
+from common import *
+from tarcopy import tree_size
+
+ROOTFSCACHEDIR = os.path.join(CACHEDIR, "rootfs")
+
+
+def _run(command):
+    return process.run(command, shell=True, ignore_status=True, verbose=is_debug()).exit_status == 0
+
+
+def is_subvolume(path):
+    """
+    Return True in case path is btrfs subvolume
+
+    :param path: str
+    :return: bool
+    """
+    return os.path.isdir(path) and _run("btrfs subvolume show %s" % path)
+
+
+def remove_tree(path):
+    """
+    Remove directory tree, also in case it is btrfs snapshot or mounted overlay
+
+    :param path: str
+    :return: None
+    """
+    if os.path.ismount(path):
+        OverlayRoot(None, path).umount()
+        return
+    if is_subvolume(path) and _run("btrfs subvolume delete %s" % path):
+        return
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class RootfsTemplates(object):
+    """
+    Templates are identified by key derived from installed packages and repositories,
+    so that changed input leads to new template. Least recently used templates are removed
+    when size of cache exceeds limit (MTF_ROOTFS_CACHE_MAX).
+    """
+
+    def __init__(self, cachedir=ROOTFSCACHEDIR, maxsize=None):
+        """
+        :param cachedir: str
+        :param maxsize: size limit of cache in MiB
+        """
+        self.cachedir = cachedir
+        self.maxsize = (get_rootfs_cache_max() if maxsize is None else maxsize) * 1024 * 1024
+
+    def path(self, key):
+        """
+        Return directory of template
+
+        :param key: str
+        :return: str
+        """
+        return os.path.join(self.cachedir, key)
+
+    @staticmethod
+    def templateKey(packages, repos=(), name=""):
+        """
+        Return key of template. Local repositories (file:///) contribute also by their metadata,
+        so that rebuilt local repository leads to new template. Repository file inside template
+        is named by module and it lists repositories in order, so both are part of key.
+
+        :param packages: list of installed packages
+        :param repos: list of repositories used for installation
+        :param name: str name of module
+        :return: str
+        """
+        items = [name, " ".join(sorted(set(packages)))]
+        for repo in repos:
+            items.append(repo)
+            if repo.startswith("file:///"):
+                repomd = os.path.join(repo[7:], "repodata", "repomd.xml")
+                if os.path.isfile(repomd):
+                    with open(repomd, "rb") as metadata:
+                        items.append(hashlib.sha256(metadata.read()).hexdigest())
+        return hashlib.sha256("\n".join(items)).hexdigest()[:32]
+
+    def __lockFile(self, key, mode):
+        """
+        Internal method, do not use it anyhow
+
+        :return: file object with lock held
+        """
+        if not os.path.isdir(self.cachedir):
+            os.makedirs(self.cachedir)
+        lockfile = open(os.path.join(self.cachedir, "%s.lock" % key), "a")
+        try:
+            fcntl.flock(lockfile, mode)
+        except BaseException:
+            lockfile.close()
+            raise
+        return lockfile
+
+    @contextmanager
+    def lock(self, key, mode=fcntl.LOCK_EX):
+        """
+        Host wide lock of template
+
+        :param key: str
+        :param mode: fcntl.LOCK_EX or fcntl.LOCK_SH, with fcntl.LOCK_NB it raises IOError when locked
+        """
+        lockfile = self.__lockFile(key, mode)
+        try:
+            yield
+        finally:
+            lockfile.close()
+
+    def __readRecord(self, key):
+        try:
+            with open(self.path(key) + ".json") as recordfile:
+                return json.load(recordfile)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def __build(self, key, build, record):
+        """
+        Internal method, do not use it anyhow
+
+        :return: None
+        """
+        tmppath = self.path(key) + ".tmp"
+        if os.path.exists(tmppath):
+            remove_tree(tmppath)
+        record["subvolume"] = _run("btrfs subvolume create %s" % tmppath)
+        if not record["subvolume"]:
+            os.mkdir(tmppath)
+        start = time.time()
+        try:
+            build(tmppath)
+        except BaseException:
+            remove_tree(tmppath)
+            raise
+        record["size"] = tree_size(tmppath)[1]
+        record["duration"] = time.time() - start
+        if os.path.exists(self.path(key)):
+            remove_tree(self.path(key))
+        os.rename(tmppath, self.path(key))
+        with open(self.path(key) + ".json", "w") as recordfile:
+            json.dump(record, recordfile)
+        print_info("Rootfs template created:", key, "%.1fs" % record["duration"])
+
+    def __clone(self, key, record, dest):
+        """
+        Internal method, do not use it anyhow
+
+        :return: str used way of cloning
+        """
+        template = self.path(key)
+        if os.path.isdir(dest):
+            # destination could be left (not empty) by previous run
+            remove_tree(dest)
+        if record.get("subvolume") and _run("btrfs subvolume snapshot %s %s" % (template, dest)):
+            return "snapshot"
+        os.mkdir(dest)
+        shutil.copystat(template, dest)
+        if _run("cp -a --reflink=always %s/. %s" % (template, dest)):
+            return "reflink"
+        # clone must not share inodes with template (hard links), writes of machine would change template
+        remove_tree(dest)
+        os.mkdir(dest)
+        shutil.copystat(template, dest)
+        if not _run("cp -a --reflink=auto %s/. %s" % (template, dest)):
+            raise NspawnExc("Unable to clone rootfs template:", template, dest)
+        return "copy"
+
+    def hold(self, key, build, info=None):
+        """
+        Return existing template, template is built first in case it does not exist.
+        Just one process builds template of key, others wait for it.
+        Template is not removed by prune until returned lock file is closed.
+
+        :param key: str returned by templateKey
+        :param build: function what installs root filesystem to directory passed as its argument
+        :param info: dict of descriptive data stored with template (packages, repositories)
+        :return: tuple (record of template, lock file)
+        """
+        while True:
+            lockfile = self.share(key)
+            if lockfile:
+                return self.__readRecord(key), lockfile
+            # exclusive lock just for build, other holders of template are not blocked by it
+            with self.lock(key):
+                if self.__readRecord(key) is None or not os.path.isdir(self.path(key)):
+                    self.__build(key, build, dict(info or {}))
+
+    def share(self, key):
+        """
+        Hold existing template, it is not removed by prune until returned lock file is closed
+
+        :param key: str returned by templateKey
+        :return: lock file, None in case template does not exist
+        """
+        lockfile = self.__lockFile(key, fcntl.LOCK_SH)
+        if self.__readRecord(key) is not None and os.path.isdir(self.path(key)):
+            os.utime(self.path(key) + ".json", None)
+            return lockfile
+        lockfile.close()
+        return None
+
+    def checkout(self, key, dest, build, info=None):
+        """
+        Make dest clone of template, template is built first in case it does not exist.
+
+        :param key: str returned by templateKey
+        :param dest: str directory of new root filesystem (existing one is removed)
+        :param build: function what installs root filesystem to directory passed as its argument
+        :param info: dict of descriptive data stored with template (packages, repositories)
+        :return: str used way of cloning
+        """
+        record, lockfile = self.hold(key, build, info)
+        try:
+            start = time.time()
+            way = self.__clone(key, record, dest)
+            print_info("Rootfs cloned from template:", key, way, "%.1fs" % (time.time() - start))
+            return way
+        finally:
+            lockfile.close()
+
+    def prune(self, keep=()):
+        """
+        Remove least recently used templates over size limit, templates in use are skipped
+
+        :param keep: list of keys what are not removed (used by this process)
+        :return: list of removed keys
+        """
+        try:
+            keys = [name[:-5] for name in os.listdir(self.cachedir) if name.endswith(".json")]
+        except OSError:
+            return []
+        templates = []
+        for key in keys:
+            record = self.__readRecord(key)
+            if record:
+                templates.append((os.path.getmtime(self.path(key) + ".json"), key, record.get("size", 0)))
+        total = sum(size for mtime, key, size in templates)
+        removed = []
+        for mtime, key, size in sorted(templates):
+            if total <= self.maxsize:
+                break
+            if key in keep:
+                continue
+            try:
+                with self.lock(key, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                    os.remove(self.path(key) + ".json")
+                    remove_tree(self.path(key))
+            except (IOError, OSError) as e:
+                print_debug("Unable to remove rootfs template:", key, e)
+                continue
+            total -= size
+            removed.append(key)
+        return removed
+
+
+class OverlayRoot(object):
+    """
+    Root filesystem of ephemeral machine: overlay filesystem of read only template (lower layer)
+    and empty upper layer mounted to root directory. Removal of machine is unmount and removal
+    of upper layer, what contains just files changed by machine.
+    """
+
+    def __init__(self, lower, root):
+        """
+        :param lower: str directory of template
+        :param root: str directory where overlay is mounted
+        """
+        self.lower = lower
+        self.root = os.path.abspath(root)
+        self.base = self.root + ".overlay"
+        self.upper = os.path.join(self.base, "upper")
+        self.work = os.path.join(self.base, "work")
+
+    def mount(self):
+        """
+        Mount overlay to root directory
+
+        :return: None
+        """
+        for directory in [self.root, self.upper, self.work]:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+        out = process.run("mount -t overlay overlay -o lowerdir=%s,upperdir=%s,workdir=%s %s" %
+                          (self.lower, self.upper, self.work, self.root), ignore_status=True, verbose=is_debug())
+        if out.exit_status != 0:
+            raise NspawnExc("Unable to mount overlay filesystem:", self.root, out.stderr)
+
+    def umount(self, remove=True):
+        """
+        Unmount overlay (lazily in case it is still busy)
+
+        :param remove: remove also root directory and upper layer
+        :return: None
+        """
+        if os.path.ismount(self.root) and not _run("umount %s" % self.root):
+            _run("umount -l %s" % self.root)
+        if remove:
+            try:
+                os.rmdir(self.root)
+            except OSError as e:
+                print_debug("Unable to remove root directory of overlay:", self.root, e)
+            shutil.rmtree(self.base, ignore_errors=True)
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+
+"""
+Receiver of systemd notification messages (sd_notify protocol). Path of socket is passed to started process
+in NOTIFY_SOCKET variable, process (systemd-nspawn --notify-ready=yes) sends READY=1 when it is ready.
+"""
+
+import os
+import time
+import shutil
+import socket
+import select
+import tempfile
+
+
+class NotifySocket(object):
+    """
+    Datagram unix socket collecting notification messages
+    """
+
+    def __init__(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="mtf-notify-")
+        self.path = os.path.join(self.tmpdir, "notify")
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.path)
+        self.messages = {}
+
+    def env(self):
+        """
+        Return environment variables for notifying process
+
+        :return: dict
+        """
+        return {"NOTIFY_SOCKET": self.path}
+
+    def wait(self, key="READY", timeout=None, alive=None):
+        """
+        Wait for message containing assignment of key (like READY=1)
+
+        :param key: str
+        :param timeout: time in seconds, None waits forever
+        :param alive: function returning False in case notifying process exited, what ends waiting
+        :return: str value of key, None in case of timeout or exited process
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while key not in self.messages:
+            remaining = 1.0 if deadline is None else min(1.0, deadline - time.time())
+            if remaining <= 0 or (alive and not alive()):
+                return None
+            if select.select([self.socket], [], [], remaining)[0]:
+                for line in self.socket.recv(4096).splitlines():
+                    if "=" in line:
+                        name, value = line.split("=", 1)
+                        self.messages[name] = value
+        return self.messages[key]
+
+    def close(self):
+        self.socket.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
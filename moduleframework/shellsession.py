@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Long living shell session (for example docker exec -i container bash), commands are sent to its stdin
+and end of their output is detected by unique markers, so that it is not needed to spawn
+new process for every command.
+"""
+
+import os
+import time
+import uuid
+import pipes
+import select
+import signal
+import subprocess
+from avocado.utils import process
+from common import *
+
+
+class ShellSession(object):
+    """
+    One bash process reading commands from stdin. Every command is evaluated in subshell (so that cd, exit
+    or variables do not influence next commands and syntax error does not break session) with stdin
+    from /dev/null. After command finishes, marker with exit status is printed to stdout and marker to stderr.
+    """
+
+    def __init__(self, argv):
+        """
+        :param argv: list of arguments what starts bash reading commands from stdin
+        """
+        self.argv = list(argv)
+        self.process = None
+        self.marker = None
+        self.counter = 0
+
+    def __getstate__(self):
+        # process is not possible to pickle (moduleframework-cmd stores helper), it is started again
+        state = self.__dict__.copy()
+        state["process"] = None
+        return state
+
+    def isAlive(self):
+        """
+        Return True in case session process is running
+
+        :return: bool
+        """
+        return self.process is not None and self.process.poll() is None
+
+    def open(self):
+        """
+        Start session process in case it is not running
+
+        :return: None
+        """
+        if self.isAlive():
+            return
+        self.close()
+        self.process = subprocess.Popen(self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, close_fds=True)
+        self.marker = "__MTF_%s__" % uuid.uuid4().hex
+
+    def close(self):
+        """
+        Stop session process
+
+        :return: None
+        """
+        if self.process is None:
+            return
+        try:
+            if self.process.poll() is None:
+                self.process.stdin.close()
+                # give shell short time to exit itself, then kill it
+                for foo in range(10):
+                    if self.process.poll() is not None:
+                        break
+                    time.sleep(0.05)
+                else:
+                    os.kill(self.process.pid, signal.SIGKILL)
+                    self.process.wait()
+        except (OSError, IOError):
+            pass
+        for stream in (self.process.stdout, self.process.stderr):
+            stream.close()
+        self.process = None
+
+    def run(self, command, timeout=None):
+        """
+        Run command inside session
+
+        :param command: str bash command
+        :param timeout: seconds, session is killed and CmdError raised in case command is not finished
+        :return: avocado.process.CmdResult
+        """
+        self.open()
+        self.counter += 1
+        marker = "%s%d" % (self.marker, self.counter)
+        script = "( eval %s ) </dev/null; printf '\\n%s %%d\\n' $?; printf '\\n%s\\n' >&2\n" % (
+            pipes.quote(command), marker, marker)
+        stdoutfd = self.process.stdout.fileno()
+        stderrfd = self.process.stderr.fileno()
+        ends = {stdoutfd: "\n%s " % marker, stderrfd: "\n%s\n" % marker}
+        start = time.time()
+        try:
+            self.process.stdin.write(script)
+            self.process.stdin.flush()
+        except IOError as e:
+            self.close()
+            raise ModuleFrameworkException("Shell session is not running:", self.argv, e)
+        outputs = {stdoutfd: "", stderrfd: ""}
+        pending = set(outputs)
+        while pending:
+            wait = None if timeout is None else timeout - (time.time() - start)
+            if wait is not None and wait <= 0:
+                self.close()
+                result = process.CmdResult(command=command, stdout=outputs[stdoutfd], stderr=outputs[stderrfd],
+                                           exit_status=None, duration=time.time() - start)
+                raise process.CmdError(command, result, "Command timeout (%ss) inside shell session" % timeout)
+            ready = select.select(list(pending), [], [], wait)[0]
+            for fd in ready:
+                data = os.read(fd, 65536)
+                if not data:
+                    self.close()
+                    raise ModuleFrameworkException("Shell session died during command:", command, outputs[fd])
+                outputs[fd] += data
+                # marker line is the last one, it is enough to search end of output
+                if outputs[fd].endswith("\n") and ends[fd] in outputs[fd][-len(ends[fd]) - 16:]:
+                    pending.discard(fd)
+        stdout, status = outputs[stdoutfd].rsplit(ends[stdoutfd], 1)
+        stderr = outputs[stderrfd].rsplit(ends[stderrfd], 1)[0]
+        return process.CmdResult(command=command, stdout=stdout, stderr=stderr,
+                                 exit_status=int(status), duration=time.time() - start)
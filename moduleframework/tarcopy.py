@@ -0,0 +1,212 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Copy of many files and directory trees as one tar stream.
+Every copied item is pair (source, destination), destination is exact path of copied file or directory
+(it is not directory where to put it). Names inside archive are destination paths relative to /,
+so that archive is extracted to / of target.
+
+Archives read from module are not trusted: every extracted item has to stay inside its destination
+(also via symbolic and hard links), otherwise extraction fails with UnsafeArchiveError.
+"""
+
+import os
+import stat
+import time
+import tarfile
+
+
+class UnsafeArchiveError(ValueError):
+    """
+    Member of archive would be extracted outside of its destination
+    """
+    pass
+
+
+class TransferStats(object):
+    """
+    Result of copy: number of files, bytes of file content and duration in seconds
+    """
+
+    def __init__(self, files=0, size=0, duration=0.0):
+        self.files = files
+        self.bytes = size
+        self.duration = duration
+
+    def __repr__(self):
+        return "<TransferStats files=%d bytes=%d duration=%.3fs>" % (self.files, self.bytes, self.duration)
+
+
+def archive_name(path):
+    """
+    Return name of path inside archive (normalized, relative to /)
+
+    :param path: str
+    :return: str
+    """
+    return os.path.normpath(os.path.join("/", path)).lstrip("/")
+
+
+def write_archive(pairs, fileobj):
+    """
+    Write tar stream of host files to fileobj, directories are added recursively
+
+    :param pairs: list of tuples (path on host, destination path)
+    :param fileobj: writable file object (pipe, socket, StringIO)
+    :return: TransferStats
+    """
+    start = time.time()
+    stats = TransferStats()
+    tar = tarfile.open(fileobj=fileobj, mode="w|")
+    try:
+        for src, dest in pairs:
+            for root, dirs, files in _walk(src):
+                for path in [root] + [os.path.join(root, name) for name in files]:
+                    info = tar.gettarinfo(path, archive_name(os.path.join(dest, os.path.relpath(path, src))))
+                    if info.isreg():
+                        with open(path, "rb") as source:
+                            tar.addfile(info, source)
+                        stats.files += 1
+                        stats.bytes += info.size
+                    else:
+                        tar.addfile(info)
+    finally:
+        tar.close()
+    stats.duration = time.time() - start
+    return stats
+
+
+def _walk(src):
+    """
+    os.walk what works also for files and does not follow symlinks to directories
+
+    :return: generator of tuples (directory, subdirectories, files)
+    """
+    if os.path.isdir(src) and not os.path.islink(src):
+        for root, dirs, files in os.walk(src):
+            # symlinks to directories are stored as symlinks
+            yield root, dirs, files + [name for name in dirs if os.path.islink(os.path.join(root, name))]
+    else:
+        yield src, [], []
+
+
+def tree_size(path):
+    """
+    Return number of regular files and their size in path (file or directory tree)
+
+    :param path: str
+    :return: tuple (files, bytes)
+    """
+    files = size = 0
+    for root, dirs, names in _walk(path):
+        for item in [root] + [os.path.join(root, name) for name in names]:
+            if os.path.isfile(item) and not os.path.islink(item):
+                files += 1
+                size += os.path.getsize(item)
+    return files, size
+
+
+def _inside(path, directory):
+    """
+    Return True in case path is directory or it is inside of it (both are absolute normalized paths)
+    """
+    return path == directory or path.startswith(directory.rstrip("/") + "/")
+
+
+def _member_name(name):
+    """
+    Return normalized name of archive member, absolute names and names with .. are rejected
+    """
+    if os.path.isabs(name) or ".." in name.split("/"):
+        raise UnsafeArchiveError("Archive member with absolute path or '..':", name)
+    return os.path.normpath(name)
+
+
+def _remap(name, mapping):
+    """
+    Return tuple (destination of pair, host path) of archive name, None in case it is not in any source
+    """
+    for src, dest in mapping:
+        if name == src or name.startswith(src + "/"):
+            return dest, dest + name[len(src):]
+    return None
+
+
+def _check_member(member, dest, target, mapping):
+    """
+    Check that member extracted to target does not write or point outside of dest,
+    hard link names are changed to host paths
+
+    :return: None
+    """
+    realdest = os.path.realpath(dest)
+    # parent directories could be symbolic links created by previous members
+    if target != dest and not _inside(os.path.realpath(os.path.dirname(target)), realdest):
+        raise UnsafeArchiveError("Archive member is outside of destination:", member.name, dest)
+    if member.issym():
+        if os.path.isabs(member.linkname) or not _inside(
+                os.path.normpath(os.path.join(os.path.dirname(target), member.linkname)), os.path.abspath(dest)):
+            raise UnsafeArchiveError("Symbolic link points outside of destination:", member.name, member.linkname)
+    elif member.islnk():
+        linked = _remap(_member_name(member.linkname), mapping)
+        if linked is None or not _inside(linked[1], dest):
+            raise UnsafeArchiveError("Hard link points outside of destination:", member.name, member.linkname)
+        member.linkname = linked[1].lstrip("/")
+    elif not (member.isreg() or member.isdir()):
+        raise UnsafeArchiveError("Unsupported type of archive member (device or fifo):", member.name)
+
+
+def extract_archive(fileobj, pairs):
+    """
+    Extract tar stream (names are source paths relative to /) to host destinations.
+    Members are checked before extraction (see UnsafeArchiveError), setuid and setgid bits are dropped.
+
+    :param fileobj: readable file object
+    :param pairs: list of tuples (source path, destination path on host)
+    :return: TransferStats
+    """
+    start = time.time()
+    stats = TransferStats()
+    mapping = [(archive_name(src), os.path.abspath(dest)) for src, dest in pairs]
+    tar = tarfile.open(fileobj=fileobj, mode="r|")
+    try:
+        for member in tar:
+            remapped = _remap(_member_name(member.name), mapping)
+            if remapped is None:
+                continue
+            dest, target = remapped
+            _check_member(member, dest, target, mapping)
+            # existing symbolic link is replaced, not followed
+            if os.path.islink(target) and not member.isdir():
+                os.unlink(target)
+            member.name = target.lstrip("/")
+            member.mode &= ~(stat.S_ISUID | stat.S_ISGID)
+            tar.extract(member, "/")
+            if member.isreg():
+                stats.files += 1
+                stats.bytes += member.size
+    finally:
+        tar.close()
+    stats.duration = time.time() - start
+    return stats
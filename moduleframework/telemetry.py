@@ -0,0 +1,270 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Resource usage of tested machine (docker container, nspawn machine) read directly from cgroup filesystem
+(cgroup v1 and v2) and from /proc/<pid>/net/dev of its main process.
+
+Counters (cpu time, block I/O, network bytes) are reported as difference between first and last sample,
+memory as peak value.
+"""
+
+import os
+import time
+import threading
+from common import *
+
+CGROUPROOT = "/sys/fs/cgroup"
+# counters what are summed as difference of first and last sample
+COUNTERS = ["cpu_ns", "blkio_read_bytes", "blkio_write_bytes", "net_rx_bytes", "net_tx_bytes"]
+
+
+def _read(path):
+    try:
+        with open(path) as statfile:
+            return statfile.read()
+    except (IOError, OSError):
+        return None
+
+
+class CgroupStats(object):
+    """
+    Reader of resource usage of process (and its cgroup)
+    """
+
+    def __init__(self, pid):
+        """
+        :param pid: main process of tested machine
+        """
+        self.pid = pid
+        # controller: directory of cgroup, key "" is cgroup v2 directory
+        self.paths = {}
+        for line in (_read("/proc/%d/cgroup" % pid) or "").splitlines():
+            hierarchy, controllers, path = line.split(":", 2)
+            if hierarchy == "0" and not controllers:
+                self.paths[""] = os.path.join(CGROUPROOT, path.lstrip("/"))
+                continue
+            for controller in controllers.split(","):
+                for mount in (controllers, controller):
+                    directory = os.path.join(CGROUPROOT, mount, path.lstrip("/"))
+                    if os.path.isdir(directory):
+                        self.paths[controller] = directory
+                        break
+
+    def __file(self, controller, name):
+        directory = self.paths.get(controller)
+        return _read(os.path.join(directory, name)) if directory else None
+
+    def cpu(self):
+        data = self.__file("cpuacct", "cpuacct.usage")
+        if data:
+            return int(data)
+        for line in (self.__file("", "cpu.stat") or "").splitlines():
+            if line.startswith("usage_usec "):
+                return int(line.split()[1]) * 1000
+        return None
+
+    def memory(self):
+        """
+        :return: tuple (current usage, peak usage) in bytes
+        """
+        current = self.__file("memory", "memory.usage_in_bytes") or self.__file("", "memory.current")
+        peak = self.__file("memory", "memory.max_usage_in_bytes") or self.__file("", "memory.peak")
+        return (int(current) if current else None), (int(peak) if peak else None)
+
+    def blkio(self):
+        """
+        :return: tuple (read bytes, written bytes)
+        """
+        read = write = 0
+        data = self.__file("blkio", "blkio.throttle.io_service_bytes") or \
+            self.__file("blkio", "blkio.io_service_bytes_recursive")
+        if data:
+            for line in data.splitlines():
+                fields = line.split()
+                if len(fields) == 3 and fields[1] in ("Read", "Write"):
+                    if fields[1] == "Read":
+                        read += int(fields[2])
+                    else:
+                        write += int(fields[2])
+            return read, write
+        data = self.__file("", "io.stat")
+        if data is None:
+            return None, None
+        for line in data.splitlines():
+            for item in line.split()[1:]:
+                key, value = item.split("=", 1)
+                if key == "rbytes":
+                    read += int(value)
+                elif key == "wbytes":
+                    write += int(value)
+        return read, write
+
+    def net(self):
+        """
+        :return: tuple (received bytes, transmitted bytes) of all interfaces except loopback
+        """
+        data = _read("/proc/%d/net/dev" % self.pid)
+        if data is None:
+            return None, None
+        rx = tx = 0
+        for line in data.splitlines()[2:]:
+            interface, counters = line.split(":", 1)
+            if interface.strip() != "lo":
+                counters = counters.split()
+                rx += int(counters[0])
+                tx += int(counters[8])
+        return rx, tx
+
+    def sample(self):
+        """
+        Return actual values
+
+        :return: dict
+        """
+        current, peak = self.memory()
+        blkread, blkwrite = self.blkio()
+        netrx, nettx = self.net()
+        return {"cpu_ns": self.cpu(),
+                "memory_bytes": current,
+                "memory_peak_bytes": peak,
+                "blkio_read_bytes": blkread,
+                "blkio_write_bytes": blkwrite,
+                "net_rx_bytes": netrx,
+                "net_tx_bytes": nettx}
+
+
+class ResourceMonitor(object):
+    """
+    Periodical sampling of resource usage in background thread during test.
+    Machine could be started more times during test (stop/start), every one is attached and summed.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = get_telemetry_interval() if interval is None else interval
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.thread = None
+        self.stats = None
+        self.first = None
+        self.last = None
+        self.totals = dict((key, 0) for key in COUNTERS)
+        self.memorypeak = 0
+        self.samples = 0
+        self.start = None
+
+    def __sample(self):
+        """
+        Internal method, take one sample of attached machine
+
+        :return: None
+        """
+        with self.lock:
+            if self.stats is None:
+                return
+            try:
+                values = self.stats.sample()
+            except (IOError, OSError, ValueError) as e:
+                print_debug("Unable to read resource usage:", e)
+                return
+            if all(value is None for value in values.values()):
+                # machine does not exist anymore
+                return
+            if self.first is None:
+                self.first = values
+            self.last = values
+            self.samples += 1
+            self.memorypeak = max(self.memorypeak, values["memory_peak_bytes"] or 0, values["memory_bytes"] or 0)
+
+    def __closeSegment(self):
+        """
+        Internal method, add counters of actual machine to totals (lock has to be held)
+
+        :return: None
+        """
+        if self.first and self.last:
+            for key in COUNTERS:
+                if self.first[key] is not None and self.last[key] is not None:
+                    self.totals[key] += self.last[key] - self.first[key]
+        self.first = self.last = None
+
+    def __worker(self):
+        while not self.finished.wait(self.interval):
+            self.__sample()
+
+    def begin(self):
+        """
+        Start sampling thread
+
+        :return: None
+        """
+        self.start = time.time()
+        self.thread = threading.Thread(target=self.__worker, name="mtf-telemetry")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def attach(self, pid):
+        """
+        Start sampling of machine with main process pid
+
+        :param pid: int
+        :return: None
+        """
+        self.__sample()
+        with self.lock:
+            self.__closeSegment()
+            self.stats = CgroupStats(int(pid))
+        self.__sample()
+
+    def end(self):
+        """
+        Stop sampling and return summary
+
+        :return: dict
+        """
+        self.__sample()
+        self.finished.set()
+        if self.thread:
+            self.thread.join()
+        with self.lock:
+            self.__closeSegment()
+            self.stats = None
+            summary = dict(self.totals)
+        summary["cpu_seconds"] = summary.pop("cpu_ns") / 1e9
+        summary["memory_peak_bytes"] = self.memorypeak
+        summary["samples"] = self.samples
+        summary["duration"] = time.time() - self.start if self.start else 0
+        return summary
+
+
+def format_summary(summary):
+    """
+    Return human readable summary
+
+    :param summary: dict returned by ResourceMonitor.end
+    :return: str
+    """
+    return ("cpu: %(cpu_seconds).2fs, memory peak: %(memory_peak_bytes)d B, "
+            "block read/write: %(blkio_read_bytes)d/%(blkio_write_bytes)d B, "
+            "network rx/tx: %(net_rx_bytes)d/%(net_tx_bytes)d B "
+            "(%(samples)d samples in %(duration).1fs)" % summary)
@@ -62,6 +62,21 @@ class NOPTimeout(object):
         pass
 
 
+def wait_for(condition, timeout, interval=0.1):
+    """
+    Call CONDITION every INTERVAL seconds until it returns true value, at most TIMEOUT seconds.
+    Return value of CONDITION, None in case of timeout.
+    """
+    deadline = time.time() + timeout
+    while True:
+        output = condition()
+        if output:
+            return output
+        if time.time() + interval > deadline:
+            return None
+        time.sleep(interval)
+
+
 class Retry(object):
     def __init__(self, attempts=1, timeout=None, exceptions=(Exception,), error=None, inverse=False, delay=None):
         """
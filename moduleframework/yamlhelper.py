@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Loading and storing of YAML files (config, moduleMD, compose metadata).
+It uses libyaml based C loader and dumper when available,
+pure python implementation of PyYAML is used as fallback.
+"""
+
+import yaml
+from common import FrozenDict, FrozenList
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    from yaml import CSafeDumper as SafeDumper
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader
+    from yaml import SafeDumper
+    LIBYAML = False
+
+
+class Dumper(SafeDumper):
+    """
+    Safe dumper what is able to store also read only objects (like parsed config)
+    """
+    pass
+
+
+Dumper.add_representer(FrozenDict, Dumper.represent_dict)
+Dumper.add_representer(FrozenList, Dumper.represent_list)
+
+
+def load(stream):
+    """
+    Parse YAML document
+
+    :param stream: str or file object
+    :return: object
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump(data, stream=None, **kwargs):
+    """
+    Serialize object to YAML document
+
+    :param data: object
+    :param stream: file object, string is returned if not set
+    :param kwargs: passed to yaml.dump (like default_flow_style)
+    :return: str or None
+    """
+    return yaml.dump(data, stream, Dumper=Dumper, **kwargs)
@@ -78,6 +78,8 @@ setup(
             'moduleframework-cmd = moduleframework.bashhelper:main',
             'modulelint = moduleframework.modulelint:main',
             'mtf-generator = moduleframework.mtf_generator:main',
+            'mtf-prewarm = moduleframework.imagepull:main',
+            'mtf-container-pool = moduleframework.containerpool:main',
         ]
     },
     setup_requires=[],
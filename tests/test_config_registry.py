@@ -0,0 +1,106 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Process wide registry of parsed config files (get_config, invalidate_config) and read only configs
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import copy
+import shutil
+import pickle
+import tempfile
+import unittest
+from moduleframework.common import ConfigExc, FrozenDict, freeze, get_config, invalidate_config
+
+
+class ConfigRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cfgfile = os.path.join(self.tmpdir, "config.yaml")
+        self.write("document: test\nmodule:\n  docker:\n    container: memcached\n")
+        self.environ = dict(os.environ)
+        os.environ["CONFIG"] = self.cfgfile
+
+    def tearDown(self):
+        invalidate_config(self.cfgfile)
+        os.environ.clear()
+        os.environ.update(self.environ)
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, content):
+        with open(self.cfgfile, "w") as cfg:
+            cfg.write(content)
+
+    def test_parsed_once(self):
+        config = get_config()
+        self.assertEqual(config["module"]["docker"]["container"], "memcached")
+        self.assertIs(get_config(), config)
+
+    def test_changed_file(self):
+        config = get_config()
+        self.write("document: test\nmodule:\n  docker:\n    container: nginx-changed\n")
+        self.assertEqual(get_config()["module"]["docker"]["container"], "nginx-changed")
+        self.assertEqual(config["module"]["docker"]["container"], "memcached")
+
+    def test_invalidate(self):
+        config = get_config()
+        invalidate_config(self.cfgfile)
+        self.assertIsNot(get_config(), config)
+        self.assertEqual(get_config(), config)
+
+    def test_missing_file(self):
+        os.environ["CONFIG"] = os.path.join(self.tmpdir, "missing.yaml")
+        self.assertRaises(ConfigExc, get_config)
+
+    def test_read_only(self):
+        config = get_config()
+        self.assertRaises(TypeError, config.__setitem__, "document", "other")
+        self.assertRaises(TypeError, config["module"].update, {})
+        self.assertRaises(TypeError, config["module"]["docker"].pop, "container")
+
+
+class FreezeTest(unittest.TestCase):
+
+    def test_nested(self):
+        data = freeze({"a": [1, {"b": 2}]})
+        self.assertIsInstance(data, FrozenDict)
+        self.assertRaises(TypeError, data["a"].append, 3)
+        self.assertRaises(TypeError, data["a"][1].__delitem__, "b")
+
+    def test_mutable_copies(self):
+        data = freeze({"a": [1]})
+        mutable = data.copy()
+        mutable["b"] = 2
+        items = list(data["a"])
+        items.append(2)
+        self.assertEqual(data, {"a": [1]})
+        self.assertEqual(copy.deepcopy(data), {"a": [1]})
+        self.assertEqual(pickle.loads(pickle.dumps(data)), {"a": [1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Installation of packages inside docker container by probed package managers (ContainerHelper)
+
+Usage: python -m unittest discover -s tests
+"""
+
+import unittest
+from moduleframework import module_framework
+
+
+class Result(object):
+
+    def __init__(self, exit_status, stdout=""):
+        self.exit_status = exit_status
+        self.stdout = stdout
+        self.stderr = ""
+
+
+class PackagersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((name, module_framework.trans_dict[name]) for name in ("HOSTPACKAGER", "GUESTPACKAGER"))
+        module_framework.trans_dict["HOSTPACKAGER"] = "dnf -y"
+        module_framework.trans_dict["GUESTPACKAGER"] = "microdnf"
+
+    def tearDown(self):
+        module_framework.trans_dict.update(self.saved)
+
+    def helper(self, imageid, working):
+        """
+        Return helper with fake container where just working package manager installs packages
+        """
+        helper = module_framework.ContainerHelper.__new__(module_framework.ContainerHelper)
+        helper.imageid = imageid
+        helper.packagers = {}
+        helper.commands = []
+
+        def run(command=None, argv=None, **kwargs):
+            helper.commands.append(command or argv)
+            if argv and argv[0] == "rpm":
+                return Result(1, "package memcached is not installed\n")
+            if argv:
+                return Result(0, "/usr/bin/dnf\n/usr/bin/microdnf\n")
+            return Result(0 if command.startswith(working) else 1)
+        helper.run = run
+        return helper
+
+    def test_fallback(self):
+        helper = self.helper("sha256:1", "microdnf")
+        self.assertTrue(helper._ContainerHelper__installPackages("image", ["memcached"]))
+        self.assertEqual(helper.commands[2:], ["dnf -y install memcached", "microdnf install memcached"])
+        # working package manager is tried first next time
+        helper.commands = []
+        self.assertTrue(helper._ContainerHelper__installPackages("image", ["memcached"]))
+        self.assertEqual(helper.commands[1:], ["microdnf install memcached"])
+
+    def test_nothing_installed(self):
+        helper = self.helper("sha256:1", "yum")
+        self.assertFalse(helper._ContainerHelper__installPackages("image", ["memcached"]))
+
+    def test_cache_per_image_id(self):
+        helper = self.helper("sha256:1", "dnf")
+        helper._ContainerHelper__installPackages("image", ["memcached"])
+        # rebuilt image with same name is probed again
+        helper.imageid = "sha256:2"
+        helper._ContainerHelper__installPackages("image", ["memcached"])
+        self.assertEqual(len([command for command in helper.commands if command[0] == "bash"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
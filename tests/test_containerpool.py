@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Pool of ready docker containers (containerpool) with fake docker command line client
+
+Usage: python -m unittest discover -s tests
+"""
+
+import shutil
+import tempfile
+import unittest
+from moduleframework import containerpool
+
+
+class Result(object):
+
+    def __init__(self, stdout="", exit_status=0):
+        self.stdout = stdout
+        self.exit_status = exit_status
+
+
+class FakeDocker(object):
+    """
+    Replacement of avocado process module, it knows docker ps, rename and rm of named containers
+    """
+
+    def __init__(self):
+        self.containers = {}
+
+    def run(self, command, **kwargs):
+        argv = command.split()
+        if argv[:2] == ["docker", "ps"]:
+            return Result("".join("%s %s\n" % (docker_id, name) for name, docker_id in self.containers.items()))
+        if argv[:2] == ["docker", "rename"]:
+            if argv[2] not in self.containers:
+                return Result(exit_status=1)
+            self.containers[argv[3]] = self.containers.pop(argv[2])
+        elif argv[:3] == ["docker", "rm", "-f"]:
+            for name, docker_id in list(self.containers.items()):
+                if docker_id == argv[3]:
+                    del self.containers[name]
+        return Result()
+
+
+class FakeHelper(object):
+    """
+    ContainerHelper starting named containers in fake docker
+    """
+
+    def __init__(self, docker):
+        self.docker = docker
+        self.docker_id = None
+
+    def start(self, args, command):
+        self.docker_id = "id%d" % len(self.docker.containers)
+        self.docker.containers[args.split("--name ")[1]] = self.docker_id
+        assert args.split("--name ")[1].startswith("mtf-filling-key-")
+
+
+class ContainerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.saved = (containerpool.process, containerpool.POOLLOCKDIR, containerpool.POOLPOLLINTERVAL)
+        self.docker = FakeDocker()
+        containerpool.process = self.docker
+        containerpool.POOLLOCKDIR = self.tmpdir
+        containerpool.POOLPOLLINTERVAL = 0
+
+    def tearDown(self):
+        containerpool.process, containerpool.POOLLOCKDIR, containerpool.POOLPOLLINTERVAL = self.saved
+        shutil.rmtree(self.tmpdir)
+
+    def test_key_repos(self):
+        key = containerpool.pool_key("image", "-it -d", "/bin/bash", ["b", "a"], ["http://a/"])
+        self.assertEqual(key, containerpool.pool_key("image", "-it -d", "/bin/bash", ["a", "b"], ["http://a/"]))
+        self.assertNotEqual(key, containerpool.pool_key("image", "-it -d", "/bin/bash", ["a", "b"], ["http://b/"]))
+
+    def test_fill_and_expire(self):
+        pool = containerpool.ContainerPool("key", 2)
+        self.assertEqual(pool.fill(FakeHelper(self.docker), "-it -d", "/bin/bash", ttl=0), 2)
+        # pool what is not used is removed
+        self.assertEqual(self.docker.containers, {})
+        self.assertFalse(pool.filling())
+
+    def test_take(self):
+        self.docker.containers = {"mtf-pool-key-1": "id1", "mtf-pool-other-1": "id2"}
+        pool = containerpool.ContainerPool("key", 1)
+        self.assertEqual(pool.take(), "id1")
+        self.assertIsNone(pool.take())
+        self.assertEqual(sorted(self.docker.containers.values()), ["id1", "id2"])
+        self.assertNotIn("mtf-pool-key-1", self.docker.containers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Docker engine API client (dockerapi) against fake daemon listening on unix socket
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import json
+import shutil
+import signal
+import struct
+import tempfile
+import threading
+import time
+import subprocess
+import unittest
+import tarfile
+import SocketServer
+import BaseHTTPServer
+from StringIO import StringIO
+from moduleframework.common import ContainerExc
+from moduleframework.dockerapi import DockerClient
+
+
+class FakeDaemon(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Handler of exec requests, output of command is sent in case it is set, otherwise stream waits forever
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, data):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.getheader("Content-Length") or 0))
+        if self.path.endswith("/exec"):
+            return self.reply(json.dumps({"Id": "execid"}))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.end_headers()
+        if self.server.output is not None:
+            self.wfile.write(struct.pack(">BxxxL", 1, len(self.server.output)) + self.server.output)
+            self.server.running = False
+            self.close_connection = 1
+            return
+        # stream is open until command is killed
+        while self.server.running:
+            time.sleep(0.05)
+        self.close_connection = 1
+
+    def do_GET(self):
+        self.reply(json.dumps({"Running": self.server.running, "ExitCode": 0, "Pid": self.server.pid}))
+
+
+class DaemonServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = self.socket.accept()
+        # BaseHTTPRequestHandler expects client address
+        return request, ("localhost", 0)
+
+
+class ExecuteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "docker.sock")
+        self.server = DaemonServer(self.path, FakeDaemon)
+        self.server.output = None
+        self.server.running = True
+        self.server.pid = None
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_output(self):
+        self.server.output = "hello\n"
+        result = DockerClient(self.path).execute("container", ["echo", "hello"], timeout=10)
+        self.assertEqual((result.stdout, result.exit_status), ("hello\n", 0))
+
+    def test_timeout(self):
+        command = subprocess.Popen(["sleep", "60"])
+        self.server.pid = command.pid
+
+        def wait():
+            self.status = command.wait()
+            self.server.running = False
+        thread = threading.Thread(target=wait)
+        thread.start()
+        result = DockerClient(self.path).execute("container", ["sleep", "60"], timeout=0.5)
+        thread.join()
+        self.assertIsNone(result.exit_status)
+        # command is killed
+        self.assertEqual(self.status, -signal.SIGKILL)
+
+
+class CopyFromTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.client = DockerClient(os.path.join(self.tmpdir, "docker.sock"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def archive(self, *members):
+        archive = StringIO()
+        tar = tarfile.open(fileobj=archive, mode="w")
+        for name, data, linkname in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            if linkname:
+                info.type = tarfile.SYMTYPE
+                info.linkname = linkname
+            tar.addfile(info, StringIO(data))
+        tar.close()
+        self.client.getArchive = lambda container, path: archive.getvalue()
+
+    def test_file(self):
+        self.archive(("hosts", "127.0.0.1 localhost\n", None))
+        self.client.copyFrom("container", "/etc/hosts", os.path.join(self.tmpdir, "copy"))
+        with open(os.path.join(self.tmpdir, "copy")) as copy:
+            self.assertEqual(copy.read(), "127.0.0.1 localhost\n")
+        # directory is destination
+        self.client.copyFrom("container", "/etc/hosts", self.tmpdir)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmpdir, "hosts")))
+
+    def test_unsafe(self):
+        self.archive(("hosts", "", "/etc/passwd"))
+        self.assertRaises(ContainerExc, self.client.copyFrom, "container", "/etc/hosts", self.tmpdir)
+        self.archive(("../hosts", "", None))
+        self.assertRaises(ContainerExc, self.client.copyFrom, "container", "/etc/hosts", self.tmpdir)
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.tmpdir), "hosts")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Local image names of container sources, their fetching and checksums of local tarballs (imagepull)
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from moduleframework import imagepull
+from moduleframework.imagepull import ImageFetcher, docker_image_name
+
+
+class Result(object):
+
+    def __init__(self, stdout="", exit_status=0):
+        self.stdout = stdout
+        self.exit_status = exit_status
+
+
+class FakeDocker(object):
+    """
+    Replacement of avocado process module, imported or pulled image exists afterwards
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.images = set()
+
+    def run(self, command, **kwargs):
+        argv = command.split()
+        self.commands.append(argv[:2])
+        if argv[1] in ("import", "pull"):
+            self.images.add(argv[-1])
+        elif argv[1] == "inspect":
+            if argv[-1] not in self.images:
+                return Result(exit_status=1)
+            return Result('[{"Id": "sha256:%s"}]' % argv[-1])
+        return Result()
+
+
+class DockerImageNameTest(unittest.TestCase):
+
+    def test_tarball(self):
+        # tarball is imported to testcontainer image
+        self.assertEqual(docker_image_name("file:///tmp/image.tar.gz"), ("testcontainer", True))
+        self.assertEqual(docker_image_name("/tmp/image.tar"), ("testcontainer", True))
+
+    def test_local_image(self):
+        self.assertEqual(docker_image_name("docker=memcached"), ("memcached", False))
+
+    def test_registry(self):
+        self.assertEqual(docker_image_name("docker.io/modularitycontainers/memcached"),
+                         ("docker.io/modularitycontainers/memcached", False))
+
+
+class FetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.saved = imagepull.process
+        self.docker = FakeDocker()
+        imagepull.process = self.docker
+        self.fetcher = ImageFetcher(cachedir=self.tmpdir)
+
+    def tearDown(self):
+        imagepull.process = self.saved
+        shutil.rmtree(self.tmpdir)
+
+    def test_tarball_imported(self):
+        tarball = os.path.join(self.tmpdir, "image.tar")
+        with open(tarball, "w") as tarfile:
+            tarfile.write("image")
+        self.assertEqual(self.fetcher.fetch(tarball)["Id"], "sha256:testcontainer")
+        self.assertIn(["docker", "import"], self.docker.commands)
+        self.assertNotIn(["docker", "pull"], self.docker.commands)
+        # unchanged tarball is not imported again
+        self.docker.commands = []
+        self.fetcher.fetch(tarball)
+        self.assertNotIn(["docker", "import"], self.docker.commands)
+
+    def test_registry_pulled(self):
+        self.fetcher.fetch("docker.io/modularitycontainers/memcached")
+        self.assertIn(["docker", "pull"], self.docker.commands)
+        self.assertNotIn(["docker", "import"], self.docker.commands)
+
+
+class ChecksumTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.tarball = os.path.join(self.tmpdir, "image.tar")
+        with open(self.tarball, "w") as tarfile:
+            tarfile.write("image")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_local_tarball(self):
+        stat = os.stat(self.tarball)
+        expected = "%d-%d" % (stat.st_size, stat.st_mtime)
+        self.assertEqual(ImageFetcher.checksum(self.tarball), expected)
+        self.assertEqual(ImageFetcher.checksum("file://" + self.tarball), expected)
+
+    def test_other_sources(self):
+        self.assertIsNone(ImageFetcher.checksum("http://example.com/image.tar"))
+        self.assertIsNone(ImageFetcher.checksum("docker=memcached"))
+        self.assertIsNone(ImageFetcher.checksum(os.path.join(self.tmpdir, "missing.tar")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Lazily formatted log messages (LogMessage) and handlers of print_info/print_debug
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+from StringIO import StringIO
+from moduleframework import common
+from moduleframework.common import LazyValue, LogMessage
+
+
+class Unprintable(object):
+
+    def __str__(self):
+        raise AttributeError("broken")
+
+
+def failing():
+    raise AttributeError("not available")
+
+
+class LogMessageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.environ = dict(os.environ)
+        for name in ("MTF_LOG_DIR", "MTF_LOG_MAX_LENGTH"):
+            os.environ.pop(name, None)
+        common.trans_dict["TESTVALUE"] = "value"
+        common.trans_dict["TESTFAILING"] = LazyValue(failing)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environ)
+        del common.trans_dict["TESTVALUE"]
+        del common.trans_dict["TESTFAILING"]
+
+    def test_template(self):
+        self.assertEqual(str(LogMessage(["{TESTVALUE}", 1])), "value\n1")
+
+    def test_not_template(self):
+        for text in ["{unknown}", "{", "}", "{0.missing}", "%d", "{TESTFAILING}"]:
+            self.assertEqual(str(LogMessage([text])), text)
+
+    def test_unprintable(self):
+        self.assertIn("unprintable Unprintable", str(LogMessage([Unprintable()])))
+
+    def test_truncate(self):
+        os.environ["MTF_LOG_MAX_LENGTH"] = "10"
+        message = str(LogMessage(["x" * 25]))
+        self.assertTrue(message.startswith("x" * 10 + "\n"))
+        self.assertIn("truncated 15 characters", message)
+
+    def test_spill(self):
+        logdir = tempfile.mkdtemp()
+        try:
+            os.environ["MTF_LOG_MAX_LENGTH"] = "10"
+            os.environ["MTF_LOG_DIR"] = logdir
+            str(LogMessage(["x" * 25]))
+            spilled = os.listdir(logdir)
+            self.assertEqual(len(spilled), 1)
+            with open(os.path.join(logdir, spilled[0])) as spillfile:
+                self.assertEqual(spillfile.read(), "x" * 25)
+        finally:
+            shutil.rmtree(logdir)
+
+
+class HandlersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stderr = sys.stderr
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+
+    def record(self, *args):
+        return logging.LogRecord("moduleframework", logging.INFO, __file__, 0, LogMessage(args), None, None)
+
+    def test_stderr_redirection(self):
+        handler = common.StderrHandler()
+        sys.stderr = StringIO()
+        handler.handle(self.record("redirected"))
+        self.assertEqual(sys.stderr.getvalue(), "redirected\n")
+
+    def test_background(self):
+        output = StringIO()
+        handler = common.BackgroundHandler(logging.StreamHandler(output))
+        handler.handle(self.record("first", Unprintable()))
+        handler.handle(self.record("second"))
+        handler.flush()
+        self.assertTrue(output.getvalue().startswith("first\n<unprintable"))
+        self.assertTrue(output.getvalue().endswith("second\n"))
+        handler.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
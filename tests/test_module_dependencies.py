@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Detection of module dependencies from cached (read only) moduleMD file
+
+Usage: python -m unittest discover -s tests
+"""
+
+import sys
+import types
+import unittest
+from moduleframework import module_framework
+from moduleframework.common import freeze
+
+
+class FakePDCParser(object):
+    """
+    PDCParser returning fixed dependencies of every module
+    """
+
+    def setLatestPDC(self, name, stream):
+        self.name = name
+
+    def generateDepModules(self):
+        return {"%s-dep" % self.name: "master"}
+
+
+class ModuleDependenciesTest(unittest.TestCase):
+
+    def setUp(self):
+        pdcdata = types.ModuleType("pdc_data")
+        pdcdata.PDCParser = FakePDCParser
+        self.saved = sys.modules.get("moduleframework.pdc_data")
+        sys.modules["moduleframework.pdc_data"] = pdcdata
+
+    def tearDown(self):
+        if self.saved is None:
+            sys.modules.pop("moduleframework.pdc_data", None)
+        else:
+            sys.modules["moduleframework.pdc_data"] = self.saved
+
+    def helper(self, modulemd):
+        helper = module_framework.RpmHelper.__new__(module_framework.RpmHelper)
+        helper.getModulemdYamlconfig = lambda: modulemd
+        return helper
+
+    def test_requires(self):
+        modulemd = freeze({"data": {"dependencies": {"requires": {"base-runtime": "master"}}}})
+        helper = self.helper(modulemd)
+        helper.setModuleDependencies()
+        self.assertEqual(helper.moduledeps, {"base-runtime": "master", "base-runtime-dep": "master"})
+        # cached moduleMD is not changed
+        self.assertEqual(dict(modulemd["data"]["dependencies"]["requires"]), {"base-runtime": "master"})
+
+    def test_no_dependencies(self):
+        helper = self.helper(freeze({"data": {}}))
+        helper.setModuleDependencies()
+        self.assertEqual(helper.moduledeps, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
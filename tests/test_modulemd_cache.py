@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Persistent moduleMD cache: revalidation via ETag after TTL, offline mode, parsing of raw documents
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import urllib2
+from StringIO import StringIO
+from moduleframework import modulemd_cache
+from moduleframework.common import ConfigExc
+
+DOCUMENT = "document: modulemd\ndata:\n  name: memcached\n"
+
+
+class FakeServer(object):
+    """
+    Replacement of urllib2.urlopen for http URLs, it records requests and answers 304 for matching ETag
+    """
+
+    def __init__(self, urlopen):
+        self.urlopen = urlopen
+        self.requests = []
+        self.document = DOCUMENT
+        self.etag = '"1"'
+
+    def __call__(self, request):
+        if isinstance(request, basestring):
+            return self.urlopen(request)
+        self.requests.append(request)
+        if request.get_header("If-none-match") == self.etag:
+            raise urllib2.HTTPError(request.get_full_url(), 304, "Not Modified", {}, None)
+        return urllib2.addinfourl(StringIO(self.document), {"ETag": self.etag}, request.get_full_url())
+
+
+class ModulemdCacheTest(unittest.TestCase):
+
+    url = "http://example.com/memcached.yaml"
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.server = FakeServer(urllib2.urlopen)
+        modulemd_cache.urllib2.urlopen = self.server
+        self.environ = dict(os.environ)
+        os.environ.pop("MTF_OFFLINE", None)
+        os.environ.pop("MTF_MODULEMD_CACHE_TTL", None)
+
+    def tearDown(self):
+        modulemd_cache.urllib2.urlopen = self.server.urlopen
+        os.environ.clear()
+        os.environ.update(self.environ)
+        shutil.rmtree(self.tmpdir)
+
+    def cache(self):
+        return modulemd_cache.ModulemdCache(cachedir=self.tmpdir)
+
+    def test_parsed_once(self):
+        cache = self.cache()
+        document = cache.get(self.url)
+        self.assertEqual(document["data"]["name"], "memcached")
+        self.assertIs(cache.get(self.url), document)
+        self.assertEqual(len(self.server.requests), 1)
+        # only raw document and index are stored, nothing executable
+        stored = [name for _, _, names in os.walk(self.tmpdir) for name in names]
+        self.assertEqual(sorted(os.path.splitext(name)[1] for name in stored), [".json", ".yaml"])
+
+    def test_ttl(self):
+        self.cache().get(self.url)
+        # new process uses cached document without network access within TTL
+        self.assertEqual(self.cache().get(self.url)["data"]["name"], "memcached")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_etag_revalidation(self):
+        self.cache().get(self.url)
+        os.environ["MTF_MODULEMD_CACHE_TTL"] = "0"
+        self.assertEqual(self.cache().get(self.url)["data"]["name"], "memcached")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1].get_header("If-none-match"), '"1"')
+
+    def test_changed_document(self):
+        self.cache().get(self.url)
+        os.environ["MTF_MODULEMD_CACHE_TTL"] = "0"
+        self.server.document = DOCUMENT.replace("memcached", "nginx")
+        self.server.etag = '"2"'
+        self.assertEqual(self.cache().get(self.url)["data"]["name"], "nginx")
+
+    def test_offline(self):
+        self.cache().get(self.url)
+        os.environ["MTF_OFFLINE"] = "yes"
+        os.environ["MTF_MODULEMD_CACHE_TTL"] = "0"
+        self.assertEqual(self.cache().get(self.url)["data"]["name"], "memcached")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_offline_not_cached(self):
+        os.environ["MTF_OFFLINE"] = "yes"
+        self.assertRaises(ConfigExc, self.cache().get, self.url)
+        self.assertEqual(self.server.requests, [])
+
+    def test_local_file(self):
+        path = os.path.join(self.tmpdir, "local.yaml")
+        with open(path, "w") as localfile:
+            localfile.write(DOCUMENT)
+        self.assertEqual(self.cache().get(path)["data"]["name"], "memcached")
+
+    def test_invalid_document(self):
+        self.server.document = "data: [unclosed\n"
+        self.assertRaises(ConfigExc, self.cache().get, self.url)
+
+
+if __name__ == "__main__":
+    unittest.main()
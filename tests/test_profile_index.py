@@ -0,0 +1,94 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Index of packages of module profiles (ProfileIndex) and its use by RpmHelper
+
+Usage: python -m unittest discover -s tests
+"""
+
+import sys
+import types
+import unittest
+from moduleframework import module_framework
+from moduleframework.common import ConfigExc, freeze
+from moduleframework.module_framework import ProfileIndex
+
+MODULEMD = freeze({"data": {"profiles": {"default": {"rpms": ["memcached", "bash", "memcached"]},
+                                         "minimal": {"rpms": ["memcached"]},
+                                         "empty": None}}})
+
+
+class ProfileIndexTest(unittest.TestCase):
+
+    def test_profile(self):
+        index = ProfileIndex(MODULEMD)
+        self.assertEqual(index.packages, ("memcached", "bash"))
+        self.assertEqual(index.getProfile("minimal"), ("memcached",))
+        self.assertEqual(index.getProfile("empty"), ())
+        self.assertRaises(ConfigExc, index.getProfile, "missing")
+
+    def test_config_packages(self):
+        config = {"packages": {"rpms": ["bash", "curl"], "profiles": ["minimal"]}}
+        index = ProfileIndex(MODULEMD, config)
+        self.assertEqual(index.packages, ("bash", "curl", "memcached"))
+
+    def test_fallback(self):
+        self.assertEqual(ProfileIndex(None, {}, "default").packages, ("bash",))
+
+    def test_install_set(self):
+        index = ProfileIndex(MODULEMD, basepackages=["systemd", "bash"])
+        self.assertEqual(index.getInstallSet(), frozenset(["memcached", "bash", "systemd"]))
+
+
+class RpmInstallSetTest(unittest.TestCase):
+
+    def setUp(self):
+        pdcdata = types.ModuleType("pdc_data")
+        pdcdata.getBasePackageSet = lambda **kwargs: ["systemd"]
+        self.saved = sys.modules.get("moduleframework.pdc_data")
+        sys.modules["moduleframework.pdc_data"] = pdcdata
+
+    def tearDown(self):
+        if self.saved is None:
+            sys.modules.pop("moduleframework.pdc_data", None)
+        else:
+            sys.modules["moduleframework.pdc_data"] = self.saved
+
+    def test_cached_index_unchanged(self):
+        helper = module_framework.RpmHelper.__new__(module_framework.RpmHelper)
+        helper.config = {"packages": {"rpms": ["memcached"]}}
+        helper.moduledeps = {}
+        helper.moduleName = "memcached"
+        helper.dependencylist = {}
+        helper.whattoinstallrpm = ""
+        index = helper.getProfileIndex()
+        helper.setRepositoriesAndWhatToInstall(repos=["http://example.com/repo/"])
+        self.assertEqual(sorted(helper.whattoinstallrpm.split()), ["memcached", "systemd"])
+        # index shared by other callers does not contain base packages
+        self.assertIs(helper.getProfileIndex(), index)
+        self.assertEqual(index.getInstallSet(), frozenset(["memcached"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Keys and clones of cached root filesystem templates (rootfscache)
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from moduleframework.rootfscache import RootfsTemplates
+
+
+def build(root):
+    os.makedirs(os.path.join(root, "etc"))
+    with open(os.path.join(root, "etc", "os-release"), "w") as release:
+        release.write("template\n")
+
+
+class TemplateKeyTest(unittest.TestCase):
+
+    def test_packages(self):
+        self.assertEqual(RootfsTemplates.templateKey(["b", "a"], ["http://a/"], "memcached"),
+                         RootfsTemplates.templateKey(["a", "b", "a"], ["http://a/"], "memcached"))
+        self.assertNotEqual(RootfsTemplates.templateKey(["a"], ["http://a/"], "memcached"),
+                            RootfsTemplates.templateKey(["a", "b"], ["http://a/"], "memcached"))
+
+    def test_module_name(self):
+        # repository file inside template is named by module
+        self.assertNotEqual(RootfsTemplates.templateKey(["a"], ["http://a/"], "memcached"),
+                            RootfsTemplates.templateKey(["a"], ["http://a/"], "nginx"))
+
+    def test_local_repository(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(tmpdir, "repodata"))
+            repo = "file://%s" % tmpdir
+            with open(os.path.join(tmpdir, "repodata", "repomd.xml"), "w") as repomd:
+                repomd.write("1")
+            key = RootfsTemplates.templateKey(["a"], [repo], "memcached")
+            with open(os.path.join(tmpdir, "repodata", "repomd.xml"), "w") as repomd:
+                repomd.write("2")
+            self.assertNotEqual(key, RootfsTemplates.templateKey(["a"], [repo], "memcached"))
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class CheckoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.templates = RootfsTemplates(cachedir=os.path.join(self.tmpdir, "cache"))
+        self.dest = os.path.join(self.tmpdir, "root")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_clone_is_independent(self):
+        self.templates.checkout("key", self.dest, build)
+        with open(os.path.join(self.dest, "etc", "os-release"), "w") as release:
+            release.write("changed\n")
+        with open(os.path.join(self.templates.path("key"), "etc", "os-release")) as release:
+            self.assertEqual(release.read(), "template\n")
+
+    def test_left_destination(self):
+        os.makedirs(os.path.join(self.dest, "left"))
+        self.templates.checkout("key", self.dest, build)
+        self.assertEqual(os.listdir(self.dest), ["etc"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Concurrent commands inside module (CommonFunctions.runParallel)
+
+Usage: python -m unittest discover -s tests
+"""
+
+import unittest
+from avocado.utils import process
+from moduleframework import module_framework
+from moduleframework.common import ParallelRunExc
+
+
+class FakeHelper(module_framework.CommonFunctions):
+    """
+    Module where commands starting with "false" fail
+    """
+    concurrentrun = True
+
+    def run(self, command="ls /", **kwargs):
+        result = process.CmdResult(command=command, stdout=command, exit_status=int(command.startswith("false")))
+        if result.exit_status:
+            raise process.CmdError(command, result)
+        return result
+
+
+class RunParallelTest(unittest.TestCase):
+
+    def test_results_in_order(self):
+        commands = ["echo %d" % index for index in range(10)]
+        results = FakeHelper().runParallel(commands, maxworkers=3)
+        self.assertEqual([result.stdout for result in results], commands)
+
+    def test_every_failure(self):
+        commands = ["false 1", "echo 2", "false 3"]
+        try:
+            FakeHelper().runParallel(commands)
+        except ParallelRunExc as e:
+            self.assertEqual(sorted(e.failures), [0, 2])
+            self.assertTrue(all(isinstance(failure, process.CmdError) for failure in e.failures.values()))
+            self.assertEqual([result and result.stdout for result in e.results], [None, "echo 2", None])
+            self.assertIn("false 1", str(e))
+            self.assertIn("false 3", str(e))
+        else:
+            self.fail("ParallelRunExc not raised")
+
+    def test_one_by_one(self):
+        helper = FakeHelper()
+        helper.concurrentrun = False
+        self.assertEqual(len(helper.runParallel(["echo 1", "echo 2"])), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Receiver of systemd notification messages (sdnotify.NotifySocket)
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import time
+import socket
+import threading
+import unittest
+from moduleframework.sdnotify import NotifySocket
+
+
+class NotifySocketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.notify = NotifySocket()
+
+    def tearDown(self):
+        self.notify.close()
+
+    def send(self, message):
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sender.sendto(message, self.notify.env()["NOTIFY_SOCKET"])
+        finally:
+            sender.close()
+
+    def test_ready(self):
+        self.send("STATUS=Starting\nMAINPID=42")
+        self.send("READY=1")
+        self.assertEqual(self.notify.wait(timeout=1), "1")
+        self.assertEqual(self.notify.messages["STATUS"], "Starting")
+        self.assertEqual(self.notify.messages["MAINPID"], "42")
+
+    def test_delayed(self):
+        timer = threading.Timer(0.2, self.send, ["READY=1"])
+        timer.start()
+        try:
+            self.assertEqual(self.notify.wait(timeout=5), "1")
+        finally:
+            timer.join()
+
+    def test_timeout(self):
+        self.send("STATUS=Starting")
+        start = time.time()
+        self.assertIsNone(self.notify.wait(timeout=0.2))
+        self.assertLess(time.time() - start, 1)
+
+    def test_process_exited(self):
+        # waiting ends when notifying process is not alive anymore
+        self.assertIsNone(self.notify.wait(alive=lambda: False))
+
+    def test_close(self):
+        path = self.notify.path
+        self.notify.close()
+        self.assertFalse(os.path.exists(os.path.dirname(path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Framing of command output in long living shell session (ShellSession) with local bash
+
+Usage: python -m unittest discover -s tests
+"""
+
+import pickle
+import unittest
+from avocado.utils import process
+from moduleframework.shellsession import ShellSession
+
+
+class ShellSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = ShellSession(["bash"])
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_output(self):
+        result = self.session.run("echo out; echo err >&2; exit 3")
+        self.assertEqual((result.stdout, result.stderr, result.exit_status), ("out\n", "err\n", 3))
+
+    def test_without_newline(self):
+        result = self.session.run("printf 'no newline'; printf 'err' >&2")
+        self.assertEqual((result.stdout, result.stderr), ("no newline", "err"))
+
+    def test_large_output(self):
+        result = self.session.run("seq 1 100000")
+        self.assertEqual(result.stdout.splitlines()[-1], "100000")
+        self.assertEqual(len(result.stdout.splitlines()), 100000)
+
+    def test_commands_isolated(self):
+        self.session.run("cd /tmp; VALUE=1; exit 1")
+        result = self.session.run("pwd; echo \"${VALUE:-unset}\"")
+        self.assertNotEqual(result.stdout.splitlines()[0], "/tmp")
+        self.assertEqual(result.stdout.splitlines()[1], "unset")
+        # one process serves all commands
+        self.assertEqual(self.session.run("echo $PPID").stdout, self.session.run("echo $PPID").stdout)
+
+    def test_syntax_error(self):
+        self.assertNotEqual(self.session.run("if then fi").exit_status, 0)
+        self.assertEqual(self.session.run("echo ok").stdout, "ok\n")
+
+    def test_stdin(self):
+        # command reading stdin gets /dev/null instead of rest of session input
+        self.assertEqual(self.session.run("cat; echo done").stdout, "done\n")
+
+    def test_timeout(self):
+        self.assertRaises(process.CmdError, self.session.run, "sleep 10", timeout=0.3)
+        self.assertFalse(self.session.isAlive())
+        # session is started again
+        self.assertEqual(self.session.run("echo again").stdout, "again\n")
+
+    def test_pickle(self):
+        self.session.run("true")
+        restored = pickle.loads(pickle.dumps(self.session))
+        try:
+            self.assertEqual(restored.run("echo restored").stdout, "restored\n")
+        finally:
+            restored.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Copy of files via tar stream (tarcopy), extraction of untrusted archives
+
+Usage: python -m unittest discover -s tests
+"""
+
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from StringIO import StringIO
+from moduleframework import tarcopy
+
+
+def archive(*members):
+    """
+    Return tar stream with members, member is tuple (name, type, linkname or content)
+    """
+    data = StringIO()
+    tar = tarfile.open(fileobj=data, mode="w")
+    for name, kind, value in members:
+        info = tarfile.TarInfo(name)
+        info.type = kind
+        if kind == tarfile.REGTYPE:
+            info.size = len(value)
+            tar.addfile(info, StringIO(value))
+        else:
+            info.linkname = value
+            tar.addfile(info)
+    tar.close()
+    data.seek(0)
+    return data
+
+
+class TarCopyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.tmpdir, "dest")
+        self.outside = os.path.join(self.tmpdir, "outside")
+        os.mkdir(self.outside)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def extract(self, *members):
+        return tarcopy.extract_archive(archive(*members), [("/src", self.dest)])
+
+    def test_round_trip(self):
+        source = os.path.join(self.tmpdir, "source")
+        os.makedirs(os.path.join(source, "sub"))
+        with open(os.path.join(source, "sub", "file"), "w") as datafile:
+            datafile.write("data")
+        os.symlink("sub/file", os.path.join(source, "link"))
+        data = StringIO()
+        written = tarcopy.write_archive([(source, "/src")], data)
+        data.seek(0)
+        read = tarcopy.extract_archive(data, [("/src", self.dest)])
+        self.assertEqual((written.files, written.bytes), (1, 4))
+        self.assertEqual((read.files, read.bytes), (1, 4))
+        self.assertEqual(open(os.path.join(self.dest, "link")).read(), "data")
+
+    def test_parent_reference(self):
+        self.assertRaises(tarcopy.UnsafeArchiveError, self.extract,
+                          ("src/../outside/file", tarfile.REGTYPE, "bad"))
+
+    def test_absolute_name(self):
+        self.assertRaises(tarcopy.UnsafeArchiveError, self.extract,
+                          ("/src/file", tarfile.REGTYPE, "bad"))
+
+    def test_symlink_outside(self):
+        self.assertRaises(tarcopy.UnsafeArchiveError, self.extract,
+                          ("src", tarfile.DIRTYPE, ""), ("src/link", tarfile.SYMTYPE, self.outside))
+        self.assertRaises(tarcopy.UnsafeArchiveError, self.extract,
+                          ("src", tarfile.DIRTYPE, ""), ("src/link", tarfile.SYMTYPE, "../outside"))
+
+    def test_write_via_existing_symlink(self):
+        os.mkdir(self.dest)
+        os.symlink(self.outside, os.path.join(self.dest, "link"))
+        self.assertRaises(tarcopy.UnsafeArchiveError, self.extract, ("src/link/file", tarfile.REGTYPE, "bad"))
+        self.assertEqual(os.listdir(self.outside), [])
+
+    def test_hardlink(self):
+        self.assertRaises(tarcopy.UnsafeArchiveError, self.extract,
+                          ("src", tarfile.DIRTYPE, ""), ("src/link", tarfile.LNKTYPE, "etc/passwd"))
+        self.extract(("src", tarfile.DIRTYPE, ""), ("src/file", tarfile.REGTYPE, "data"),
+                     ("src/link", tarfile.LNKTYPE, "src/file"))
+        self.assertEqual(os.stat(os.path.join(self.dest, "link")).st_ino,
+                         os.stat(os.path.join(self.dest, "file")).st_ino)
+
+
+if __name__ == "__main__":
+    unittest.main()
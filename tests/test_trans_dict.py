@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Lazily resolved values of trans_dict (TransDict, LazyValue) and their use by helpers
+
+Usage: python -m unittest discover -s tests
+"""
+
+import unittest
+from moduleframework import module_framework
+from moduleframework.common import LazyValue, TransDict, format_command, trans_dict
+
+
+class Counter(object):
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TransDictTest(unittest.TestCase):
+
+    def test_resolved_once(self):
+        counter = Counter("10.0.0.1")
+        values = TransDict({"IP": LazyValue(counter), "PLAIN": "x"})
+        self.assertEqual(counter.calls, 0)
+        self.assertEqual(values["IP"], "10.0.0.1")
+        self.assertEqual(values.get("IP"), "10.0.0.1")
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(values.get("MISSING", "default"), "default")
+
+    def test_format(self):
+        used = Counter("10.0.0.1")
+        unused = Counter("unused")
+        values = TransDict({"IP": LazyValue(used), "OTHER": LazyValue(unused)})
+        self.assertEqual("ping {IP}".format(**values), "ping 10.0.0.1")
+        self.assertEqual("{IP:>10}".format(**values), "  10.0.0.1")
+        # formatting resolves just used values
+        self.assertEqual(unused.calls, 0)
+
+    def test_copy(self):
+        values = TransDict({"IP": LazyValue(Counter("10.0.0.1"))})
+        self.assertEqual(values.copy(), {"IP": "10.0.0.1"})
+        self.assertEqual(dict(values.items()), {"IP": "10.0.0.1"})
+        self.assertEqual(values.values(), ["10.0.0.1"])
+
+    def test_format_command(self):
+        self.assertEqual(format_command("echo {ROOT}"), "echo /")
+
+
+class IpaddrTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((name, dict.__getitem__(trans_dict, name)) for name in ("HOSTIPADDR", "GUESTIPADDR"))
+        self.counter = Counter("10.0.0.1")
+        trans_dict["HOSTIPADDR"] = LazyValue(self.counter)
+        trans_dict["GUESTIPADDR"] = "10.0.0.2"
+
+    def tearDown(self):
+        trans_dict.update(self.saved)
+
+    def test_lazy(self):
+        helper = module_framework.CommonFunctions()
+        # helper construction does not probe host network
+        self.assertEqual(self.counter.calls, 0)
+        self.assertEqual(helper.getIPaddr(), "10.0.0.1")
+        helper.ipaddrkey = "GUESTIPADDR"
+        self.assertEqual(helper.ipaddr, "10.0.0.2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Loading and dumping of YAML documents (yamlhelper)
+
+Usage: python -m unittest discover -s tests
+"""
+
+import unittest
+import yaml
+from StringIO import StringIO
+from moduleframework import yamlhelper
+from moduleframework.common import freeze
+
+
+class YamlHelperTest(unittest.TestCase):
+
+    def test_load(self):
+        document = "data:\n  profiles:\n    default:\n      rpms: [memcached, bash]\n"
+        self.assertEqual(yamlhelper.load(document),
+                         {"data": {"profiles": {"default": {"rpms": ["memcached", "bash"]}}}})
+        self.assertEqual(yamlhelper.load(StringIO(document)), yamlhelper.load(document))
+
+    def test_safe(self):
+        # python objects are not constructed from untrusted documents
+        self.assertRaises(yaml.YAMLError, yamlhelper.load, "!!python/object/apply:os.system ['true']")
+
+    def test_dump_frozen(self):
+        data = freeze({"name": "memcached", "rpms": ["memcached", "bash"], "nested": {"a": 1}})
+        dumped = yamlhelper.dump(data, default_flow_style=False)
+        self.assertNotIn("!!python", dumped)
+        self.assertEqual(yamlhelper.load(dumped), data)
+
+    def test_dump_stream(self):
+        stream = StringIO()
+        self.assertIsNone(yamlhelper.dump({"a": [1, 2]}, stream))
+        self.assertEqual(yamlhelper.load(stream.getvalue()), {"a": [1, 2]})
+
+
+if __name__ == "__main__":
+    unittest.main()
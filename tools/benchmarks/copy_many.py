@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Compare copy of many small files to module one by one (copyTo) and in one transfer (copyToMany)
+for selected module type (MODULE variable, config via CONFIG)
+
+Usage: MODULE=docker CONFIG=config.yaml python tools/benchmarks/copy_many.py [-f FILES] [-s SIZE]
+"""
+
+import os
+import time
+import shutil
+import tempfile
+from optparse import OptionParser
+from moduleframework import module_framework
+
+
+def main():
+    parser = OptionParser(usage="%prog [-f FILES] [-s SIZE]")
+    parser.add_option("-f", "--files", type="int", dest="files", default=50,
+                      help="number of copied files")
+    parser.add_option("-s", "--size", type="int", dest="size", default=4096,
+                      help="size of every file in bytes")
+    (options, args) = parser.parse_args()
+    tmpdir = tempfile.mkdtemp()
+    paths = []
+    for number in range(options.files):
+        paths.append(os.path.join(tmpdir, "file%d" % number))
+        with open(paths[-1], "wb") as datafile:
+            datafile.write(os.urandom(options.size))
+    backend, moduletype = module_framework.get_correct_backend()
+    print "module type:", moduletype
+    backend.setUp()
+    try:
+        backend.start()
+        start = time.time()
+        for path in paths:
+            backend.copyTo(path, "/tmp/single-%s" % os.path.basename(path))
+        print "%-12s %.3fs" % ("copyTo", time.time() - start)
+        stats = backend.copyToMany([(path, "/tmp/many/%s" % os.path.basename(path)) for path in paths])
+        print "%-12s %.3fs (%d files, %d bytes)" % ("copyToMany", stats.duration, stats.files, stats.bytes)
+    finally:
+        backend.tearDown()
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Measure rate of run() calls of docker module type for both transports
+(docker command line client and Docker Engine API) and for long living shell session,
+config via CONFIG variable
+
+Usage: CONFIG=config.yaml python tools/benchmarks/docker_run_rate.py [-n COUNT]
+"""
+
+import os
+import time
+from optparse import OptionParser
+from moduleframework import module_framework
+
+
+def measure(mode, count):
+    if mode == "session":
+        os.environ["MTF_DOCKER_SESSION"] = "yes"
+    else:
+        os.environ["MTF_DOCKER_TRANSPORT"] = mode
+    backend = module_framework.ContainerHelper()
+    backend.setUp()
+    try:
+        backend.start()
+        start = time.time()
+        for foo in range(count):
+            backend.run("true", verbose=False)
+        duration = time.time() - start
+    finally:
+        backend.tearDown()
+    print "%-8s %d calls: %.3fs (%.1f calls per second)" % (mode, count, duration, count / duration)
+
+
+def main():
+    parser = OptionParser(usage="%prog [-n COUNT]")
+    parser.add_option("-n", "--count", type="int", dest="count", default=100,
+                      help="number of commands")
+    (options, args) = parser.parse_args()
+    for mode in ["cli", "api", "session"]:
+        measure(mode, options.count)
+
+
+if __name__ == "__main__":
+    main()
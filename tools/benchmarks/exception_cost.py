@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Measure cost of creating framework exceptions, like Retry decorator in PDCParser.download_tagged
+does for every package of koji tag. Exceptions are created while another exception is handled,
+so that there is context to capture.
+
+Usage: python tools/benchmarks/exception_cost.py [-n PACKAGES]
+"""
+
+import time
+from optparse import OptionParser
+from moduleframework.common import KojiExc, DEFAULTRETRYCOUNT
+from moduleframework.timeoutlib import Retry
+
+
+def decorate_packages(count):
+    try:
+        raise IOError("previous error")
+    except IOError:
+        for foo in range(count):
+            @Retry(attempts=DEFAULTRETRYCOUNT, error=KojiExc("RETRY: Unable to fetch package"))
+            def tmpfunc():
+                pass
+            tmpfunc()
+
+
+def main():
+    parser = OptionParser(usage="%prog [-n PACKAGES]")
+    parser.add_option("-n", "--packages", type="int", dest="packages", default=5000,
+                      help="number of packages in koji tag")
+    (options, args) = parser.parse_args()
+    start = time.time()
+    decorate_packages(options.packages)
+    duration = time.time() - start
+    print "%d packages: %.3fs (%.1f us per package)" % (options.packages, duration,
+                                                        duration * 1000000 / options.packages)
+
+
+if __name__ == "__main__":
+    main()
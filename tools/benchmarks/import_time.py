@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Measure latency of importing moduleframework modules in fresh python process.
+Compare output of this script before and after change (git stash) to see difference.
+With --entry-points it measures startup of console scripts (import of module and main function).
+
+Usage: python tools/benchmarks/import_time.py [-n COUNT] [-e] [MODULE ...]
+"""
+
+import sys
+import time
+import subprocess
+from optparse import OptionParser
+
+DEFAULT_MODULES = ["moduleframework.common",
+                   "moduleframework.module_framework"]
+# console scripts from setup.py
+ENTRY_POINTS = {"moduleframework-cmd": "moduleframework.bashhelper",
+                "mtf-generator": "moduleframework.mtf_generator",
+                "mtf-prewarm": "moduleframework.imagepull",
+                "mtf-container-pool": "moduleframework.containerpool"}
+
+
+def measure(statement, count):
+    """
+    Run statement in new python interpreter count times
+
+    :param statement: python code passed to python -c
+    :param count: number of runs
+    :return: list of durations in seconds
+    """
+    durations = []
+    for foo in range(count):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", statement])
+        durations.append(time.time() - start)
+    return durations
+
+
+def report(name, durations):
+    durations = sorted(durations)
+    print "%-45s min: %.3fs median: %.3fs max: %.3fs" % (
+        name, durations[0], durations[len(durations) / 2], durations[-1])
+
+
+def main():
+    parser = OptionParser(usage="%prog [-n COUNT] [-e] [MODULE ...]")
+    parser.add_option("-n", "--count", type="int", dest="count", default=10,
+                      help="number of runs for every module")
+    parser.add_option("-e", "--entry-points", action="store_true", dest="entrypoints", default=False,
+                      help="measure startup of console scripts")
+    (options, args) = parser.parse_args()
+    report("python (baseline interpreter start)", measure("pass", options.count))
+    if options.entrypoints:
+        for name in sorted(ENTRY_POINTS):
+            report(name, measure("from %s import main" % ENTRY_POINTS[name], options.count))
+        return
+    for module in args or DEFAULT_MODULES:
+        report(module, measure("import %s" % module, options.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+
+"""
+Compare setup and teardown time of root filesystem of nspawn machine:
+  copy       full copy of tree and shutil.rmtree (like installation to new chroot and its removal)
+  clone      clone of cached template (MTF_ROOTFS_CACHE) and its removal
+  overlay    overlay mount of template and removal of upper layer (MTF_NSPAWN_EPHEMERAL)
+Template is synthetic tree of small files or existing root filesystem. Overlay needs root privileges.
+
+Usage: python tools/benchmarks/nspawn_rootfs.py [-f FILES] [-r ROUNDS] [-t TEMPLATE]
+"""
+
+import os
+import time
+import shutil
+import tempfile
+from optparse import OptionParser
+from moduleframework.rootfscache import RootfsTemplates, OverlayRoot, remove_tree
+
+
+def synthetic_tree(root, files):
+    for number in range(files):
+        directory = os.path.join(root, "usr", "share", "dir%d" % (number / 100))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(os.path.join(directory, "file%d" % number), "wb") as datafile:
+            datafile.write("x" * 512)
+
+
+def measure(setup, teardown, rounds):
+    setuptime = teardowntime = 0.0
+    for foo in range(rounds):
+        start = time.time()
+        root = setup()
+        # machine changes something
+        with open(os.path.join(root, "usr", "changed"), "w") as changed:
+            changed.write("changed")
+        setuptime += time.time() - start
+        start = time.time()
+        teardown(root)
+        teardowntime += time.time() - start
+    return setuptime / rounds, teardowntime / rounds
+
+
+def main():
+    parser = OptionParser(usage="%prog [-f FILES] [-r ROUNDS] [-t TEMPLATE]")
+    parser.add_option("-f", "--files", type="int", dest="files", default=20000,
+                      help="number of files of synthetic template")
+    parser.add_option("-r", "--rounds", type="int", dest="rounds", default=3,
+                      help="number of measured rounds")
+    parser.add_option("-t", "--template", dest="template", default=None,
+                      help="existing root filesystem used as template")
+    (options, args) = parser.parse_args()
+    tmpdir = tempfile.mkdtemp(dir="/var/tmp")
+    templates = RootfsTemplates(cachedir=os.path.join(tmpdir, "cache"))
+    if options.template:
+        build = lambda root: os.rmdir(root) or shutil.copytree(options.template, root, symlinks=True)
+    else:
+        build = lambda root: synthetic_tree(root, options.files)
+    record, lockfile = templates.hold("benchmark", build)
+    template = templates.path("benchmark")
+    target = os.path.join(tmpdir, "root")
+    ways = {}
+
+    def copy():
+        shutil.copytree(template, target, symlinks=True)
+        return target
+
+    def clone():
+        ways["clone"] = templates.checkout("benchmark", target, build)
+        return target
+
+    def overlay():
+        OverlayRoot(template, target).mount()
+        return target
+
+    try:
+        for name, setup, teardown in [("copy", copy, shutil.rmtree), ("clone", clone, remove_tree),
+                                      ("overlay", overlay, lambda root: OverlayRoot(template, root).umount())]:
+            try:
+                setuptime, teardowntime = measure(setup, teardown, options.rounds)
+            except Exception as e:
+                print "%-10s unavailable: %s" % (name, e)
+                remove_tree(target)
+                continue
+            print "%-10s setup %.3fs teardown %.3fs %s" % (name, setuptime, teardowntime, ways.get(name, ""))
+    finally:
+        lockfile.close()
+        remove_tree(target)
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Measure per command overhead of run() for selected module type (MODULE variable, config via CONFIG)
+It compares command string (formatted, executed via bash) and argv mode (executed directly)
+
+Usage: MODULE=docker CONFIG=config.yaml python tools/benchmarks/run_overhead.py [-n COUNT]
+"""
+
+import time
+from optparse import OptionParser
+from moduleframework import module_framework
+
+
+def measure(name, func, count):
+    start = time.time()
+    for foo in range(count):
+        func()
+    duration = time.time() - start
+    print "%-30s %d calls: %.3fs (%.1f ms per call)" % (name, count, duration, duration * 1000 / count)
+
+
+def main():
+    parser = OptionParser(usage="%prog [-n COUNT]")
+    parser.add_option("-n", "--count", type="int", dest="count", default=100,
+                      help="number of commands")
+    (options, args) = parser.parse_args()
+    backend, moduletype = module_framework.get_correct_backend()
+    print "module type:", moduletype
+    backend.setUp()
+    try:
+        backend.start()
+        measure("run(command)", lambda: backend.run("true", verbose=False), options.count)
+        measure("run(argv)", lambda: backend.run(argv=["true"], verbose=False), options.count)
+        measure("runHost(command)", lambda: backend.runHost("true", verbose=False), options.count)
+        measure("runHost(argv)", lambda: backend.runHost(argv=["true"], verbose=False), options.count)
+    finally:
+        backend.tearDown()
+
+
+if __name__ == "__main__":
+    main()
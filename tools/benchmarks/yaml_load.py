@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This Modularity Testing Framework helps you to write tests for modules
+# Copyright (C) 2017 Red Hat, Inc.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# he Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Authors: Jan Scotka <jscotka@redhat.com>
+#
+
+"""
+Compare parse time of pure python PyYAML loader and moduleframework.yamlhelper
+on large synthetic modules.yaml (similar to compose metadata)
+
+Usage: python tools/benchmarks/yaml_load.py [-m MODULES] [-r RPMS]
+"""
+
+import time
+import yaml
+from optparse import OptionParser
+from moduleframework import yamlhelper
+
+
+def synthetic_modules(modules, rpms):
+    """
+    Generate structure similar to modules.yaml from compose
+
+    :param modules: number of modules
+    :param rpms: number of rpms in every module
+    :return: dict
+    """
+    out = {"modules": []}
+    for mod in range(modules):
+        rpmlist = ["package-%d-%d" % (mod, rpm) for rpm in range(rpms)]
+        out["modules"].append({
+            "document": "modulemd",
+            "version": 1,
+            "data": {
+                "name": "module%d" % mod,
+                "stream": "master",
+                "version": 20170101000000 + mod,
+                "summary": "Synthetic module %d" % mod,
+                "description": "Synthetic module generated for benchmark " * 5,
+                "license": {"module": ["MIT"]},
+                "dependencies": {"buildrequires": {"base-runtime": "master"},
+                                 "requires": {"base-runtime": "master"}},
+                "profiles": {"default": {"rpms": rpmlist[:rpms / 4]},
+                             "container": {"rpms": rpmlist[:rpms / 2]}},
+                "api": {"rpms": rpmlist},
+                "components": {"rpms": dict(
+                    (name, {"rationale": "Part of benchmark", "ref": "f" * 40})
+                    for name in rpmlist)},
+            }})
+    return out
+
+
+def measure(name, func, document):
+    start = time.time()
+    func(document)
+    print "%-40s %.3fs" % (name, time.time() - start)
+
+
+def main():
+    parser = OptionParser(usage="%prog [-m MODULES] [-r RPMS]")
+    parser.add_option("-m", "--modules", type="int", dest="modules", default=200,
+                      help="number of modules in generated document")
+    parser.add_option("-r", "--rpms", type="int", dest="rpms", default=40,
+                      help="number of rpms in every module")
+    (options, args) = parser.parse_args()
+    document = yaml.dump(synthetic_modules(options.modules, options.rpms))
+    print "document size: %d bytes, libyaml available: %s" % (len(document), yamlhelper.LIBYAML)
+    measure("yaml.load (pure python Loader)", lambda doc: yaml.load(doc, Loader=yaml.Loader), document)
+    measure("yaml.safe_load (pure python)", yaml.safe_load, document)
+    measure("yamlhelper.load", yamlhelper.load, document)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,9 +41,9 @@ class ComposeTest(module_framework.NspawnAvocadoTest):
         try to install and remove components for each profile
         """
         self.log.info("Checking availability of component and installation and remove them")
-        allprofiles = self.getModulemdYamlconfig()["data"].get("profiles") if self.getModulemdYamlconfig()["data"].get("profiles") else []
-        for profile in allprofiles:
-            actualpackagelist = set(self.getModulemdYamlconfig()["data"]["profiles"][profile]["rpms"]) - set(self.backend.bootstrappackages)
+        profileindex = self.getProfileIndex()
+        for profile in profileindex.profiles:
+            actualpackagelist = profileindex.profiles[profile] - profileindex.basepackages
             packager = common.trans_dict["GUESTPACKAGER"]
             if actualpackagelist:
                 checkpackage = self.run("rpm -q --qf='%{{name}}\\n' " + " ".join(actualpackagelist), ignore_status=True).stdout.split()
@@ -96,9 +96,10 @@ class rpmvalidation(module_framework.AvocadoTest):
     def test(self):
         allpackages = filter(bool, self.run("rpm -qa").stdout.split("\n"))
         common.print_debug(allpackages)
-        for package in allpackages:
-            if 'filesystem' in package:
-                continue
-            for package_file in filter(bool, self.run("rpm -ql %s" % package).stdout.split("\n")):
+        allpackages = [package for package in allpackages if 'filesystem' not in package]
+        # file lists of packages are independent, they are read concurrently where module type allows it
+        results = self.runParallel(["rpm -ql %s" % package for package in allpackages])
+        for package, result in zip(allpackages, results):
+            for package_file in filter(bool, result.stdout.split("\n")):
                 if not self._compare_fhs(package_file):
                     self.fail("(%s): File [%s] violates the FHS." % (package, package_file))